@@ -23,19 +23,19 @@ a = Analysis(
 )
 pyz = PYZ(a.pure)
 
+# onedir, uncompressed: a onefile build unpacks itself to a temp dir on
+# every launch and UPX adds decompression on top — both before the first
+# window.  Ship the CAPPGameViewer folder instead.
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='CAPPGameViewer',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -43,3 +43,12 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='CAPPGameViewer',
+)
@@ -0,0 +1,64 @@
+"""
+Season-wide QC benchmark: per-row AnomalyChecker.check + _qc_flag_entries
+versus qc_batch packing + vectorized check_batch / flag_batch over the same
+mapped entries.  Also asserts the two paths produce identical output.
+
+    python benchmarks/bench_batch_qc.py [--games 800] [--plays 180]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import espn_fetcher
+import qc_batch
+from qc_rules import AnomalyChecker
+from synthetic import make_raw_summaries
+
+
+def _best(fn, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--games", type=int, default=800, help="~one CFB regular season")
+    ap.add_argument("--plays", type=int, default=180)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    games = []
+    for raw, league in make_raw_summaries(args.games, args.plays):
+        result = espn_fetcher._map_raw(raw, league)
+        games.append((result["entries"], result["home_name"], result["away_name"]))
+    rows = sum(len(e) for e, _, _ in games)
+    print(f"{args.games} games, {rows:,} entries, best of {args.repeat}")
+
+    checker = AnomalyChecker()
+    t_row, (row_issues, row_flags) = _best(lambda: (
+        [checker.check(e, h, a) for e, h, a in games],
+        [espn_fetcher._qc_flag_entries(e, h, a) for e, h, a in games]), args.repeat)
+    t_pack, packed = _best(lambda: qc_batch.pack(games), args.repeat)
+    t_vec, (batch_issues, batch_flags) = _best(lambda: (
+        qc_batch.check_batch(packed), qc_batch.flag_batch(packed)), args.repeat)
+
+    assert batch_issues == row_issues, "check_batch differs from AnomalyChecker.check"
+    assert batch_flags == row_flags, "flag_batch differs from _qc_flag_entries"
+
+    issues = sum(len(i) for i in row_issues)
+    print(f"  per-row          {t_row * 1000:8.1f} ms   ({issues} issues)")
+    print(f"  batch pack       {t_pack * 1000:8.1f} ms")
+    print(f"  batch rules      {t_vec * 1000:8.1f} ms   x{t_row / t_vec:5.1f}")
+    print(f"  batch total      {(t_pack + t_vec) * 1000:8.1f} ms   x{t_row / (t_pack + t_vec):5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Desktop client request latency: a bare requests.get per call (new
+connection each time, what the apps used to do) versus CappClient's pooled
+keep-alive session, its conditional GETs (304 for unchanged play lists) and
+fetch_many.  A local server stands in for the data server; each new
+connection pays --handshake-ms to model the TCP + TLS setup to the hosted
+server, and every request --rtt-ms.
+
+    python benchmarks/bench_client.py [--calls 60] [--handshake-ms 80] [--rtt-ms 30]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import requests
+
+import espn_fetcher
+from capp_client import CappClient
+from synthetic import make_raw_summaries
+
+
+def _serve(body, handshake, rtt):
+    etag = 'W/"bench-1"'
+    packed = gzip.compress(body)
+    sent = {"bytes": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"       # keep-alive
+
+        def setup(self):
+            time.sleep(handshake)           # once per connection
+            super().setup()
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            time.sleep(rtt)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            data = body
+            self.send_response(200)
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                data = packed
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            sent["bytes"] += len(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, sent
+
+
+def _report(name, latencies, sent, calls):
+    latencies = sorted(latencies)
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"  {name:<22} p50 {pct(0.50):7.1f} ms   p95 {pct(0.95):7.1f} ms   "
+          f"{sent['bytes'] / calls / 1024:7.1f} KiB/call")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=60)
+    ap.add_argument("--plays", type=int, default=180)
+    ap.add_argument("--handshake-ms", type=float, default=80)
+    ap.add_argument("--rtt-ms", type=float, default=30)
+    args = ap.parse_args()
+
+    raw, league = make_raw_summaries(1, args.plays)[0]
+    body = json.dumps(espn_fetcher._map_raw(raw, league)).encode()
+    server, sent = _serve(body, args.handshake_ms / 1000, args.rtt_ms / 1000)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    path = "/game/401000000/plays"
+    print(f"{args.calls} calls, {len(body) / 1024:.0f} KiB play list, "
+          f"handshake {args.handshake_ms:.0f} ms, rtt {args.rtt_ms:.0f} ms")
+
+    def timed(fn):
+        sent["bytes"] = 0
+        latencies = []
+        for _ in range(args.calls):
+            t0 = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - t0)
+        return latencies
+
+    # Identity encoding: what the apps received before the server compressed
+    _report("bare requests.get", timed(lambda: requests.get(
+        base + path, headers={"Accept-Encoding": "identity", "Connection": "close"},
+        timeout=10).json()), sent, args.calls)
+    client = CappClient(base_url=base)
+    _report("pooled", timed(lambda: client.get(path)), sent, args.calls)
+    _report("pooled + conditional", timed(lambda: client.get(path, conditional=True)),
+            sent, args.calls)
+
+    sent["bytes"] = 0
+    t0 = time.perf_counter()
+    client.fetch_many([(f"/game/{i}/plays", None) for i in range(args.calls)], conditional=False)
+    elapsed = time.perf_counter() - t0
+    print(f"  fetch_many             {elapsed * 1000 / args.calls:7.1f} ms/call   "
+          f"({args.calls} calls in {elapsed * 1000:.0f} ms)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Tail-latency benchmark for the upstream governor: a simulated ESPN where a
+few percent of connections stall, fetched with and without hedging.
+
+    python benchmarks/bench_hedging.py [--calls 300] [--stall-rate 0.03]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import requests
+
+from upstream import UpstreamGovernor
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+
+
+class StallingSession:
+    """Answers in ~40-80 ms, except `stall_rate` of requests hang for
+    `stall` s (cut short by the request timeout, like a real socket)."""
+
+    def __init__(self, stall_rate, stall, seed=0):
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.rnd = random.Random(seed)
+
+    def get(self, url, timeout=None, **kwargs):
+        latency = self.rnd.uniform(0.04, 0.08)
+        if self.rnd.random() < self.stall_rate:
+            latency = self.stall
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise requests.Timeout("simulated stall")
+        time.sleep(latency)
+        return _Response()
+
+
+def run(hedge, args):
+    gov = UpstreamGovernor(StallingSession(args.stall_rate, args.stall),
+                           rate=1000, burst=1000, backoff_base=0.01)
+    latencies = []
+    for _ in range(args.calls):
+        t0 = time.perf_counter()
+        try:
+            gov.get("summary", "http://espn.invalid/summary", timeout=15,
+                    deadline=time.monotonic() + args.budget, hedge=hedge)
+        except Exception:
+            pass
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    stats = gov.stats()["summary"]
+    print(f"  hedge={'on ' if hedge else 'off'}  p50 {pct(0.50):7.1f} ms   "
+          f"p95 {pct(0.95):7.1f} ms   p99 {pct(0.99):7.1f} ms   "
+          f"hedged={stats['hedged']} requests={stats['requests']}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=300)
+    ap.add_argument("--stall-rate", type=float, default=0.03)
+    ap.add_argument("--stall", type=float, default=2.0)
+    ap.add_argument("--budget", type=float, default=8.0)
+    args = ap.parse_args()
+    print(f"{args.calls} calls, {args.stall_rate:.0%} stall for {args.stall:.1f} s")
+    run(False, args)
+    run(True, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Poll-cycle mapping benchmark: decode + map N live games inline versus across
+CAPP_MAP_WORKERS worker processes.
+
+    python benchmarks/bench_poll_cycle.py [--games 60] [--plays 180] [--workers 0 2 4]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import espn_fetcher
+from synthetic import make_raw_summaries
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--games", type=int, default=60)
+    ap.add_argument("--plays", type=int, default=180)
+    ap.add_argument("--cycles", type=int, default=3)
+    ap.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    args = ap.parse_args()
+
+    jobs = make_raw_summaries(args.games, args.plays)
+    mb = sum(len(raw) for raw, _ in jobs) / 1e6
+    print(f"{args.games} games x {args.plays} plays ({mb:.1f} MB raw), "
+          f"best of {args.cycles} cycles")
+
+    baseline = None
+    for workers in args.workers:
+        espn_fetcher.MAP_WORKERS = workers
+        espn_fetcher._shutdown_mapping_pool()
+        espn_fetcher._map_raw_batch(jobs[:max(workers, 1)])   # warm the pool
+        best = float("inf")
+        for _ in range(args.cycles):
+            t0 = time.perf_counter()
+            results = espn_fetcher._map_raw_batch(jobs)
+            best = min(best, time.perf_counter() - t0)
+        errors = sum(isinstance(r, Exception) for r in results)
+        baseline = baseline or best
+        print(f"  workers={workers:<2}  cycle {best * 1000:8.1f} ms   "
+              f"x{baseline / best:4.2f}   errors={errors}")
+    espn_fetcher._shutdown_mapping_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Synthetic ESPN summary responses for the benchmarks — shaped like the real
+/summary payload closely enough to exercise the whole mapping pipeline.
+"""
+
+import json
+import random
+
+
+def make_summary(game_id="401000000", n_plays=180, seed=0, state="in"):
+    rnd = random.Random(seed)
+    home_id, away_id = "1", "2"
+    drives = []
+    plays = []
+    home = away = 0
+    period, clock = 1, 900
+    offense = home_id
+    for seq in range(1, n_plays + 1):
+        clock -= rnd.randint(5, 40)
+        if clock <= 0:
+            period, clock = min(period + 1, 4), 900
+        yte = rnd.randint(1, 99)
+        scoring = rnd.random() < 0.05
+        play_type = "Rush" if rnd.random() < 0.5 else "Pass Reception"
+        play = {
+            "id": f"{game_id}{seq:04d}",
+            "sequenceNumber": str(seq),
+            "type": {"id": "5", "text": play_type},
+            "text": f"Player {seq % 11} runs for a gain",
+            "clock": {"displayValue": f"{clock // 60}:{clock % 60:02d}"},
+            "period": {"number": period},
+            "start": {"down": rnd.randint(1, 4), "distance": rnd.randint(1, 10),
+                      "yardsToEndzone": yte, "yardLine": yte, "team": {"id": offense}},
+            "end": {"down": 1, "distance": 10, "yardsToEndzone": max(0, yte - 5)},
+            "statYardage": rnd.randint(-5, 20),
+            "scoringPlay": scoring,
+            "scoreValue": 6 if scoring else 0,
+            "homeScore": home,
+            "awayScore": away,
+        }
+        if scoring:
+            play["type"]["text"] = "Rushing Touchdown"
+            if offense == home_id:
+                home += 7
+            else:
+                away += 7
+            play["homeScore"], play["awayScore"] = home, away
+            play["pointAfterAttempt"] = {"text": "Extra Point Good", "value": 1}
+        plays.append(play)
+        if scoring or rnd.random() < 0.1:
+            drives.append({"team": {"id": offense}, "plays": plays})
+            plays = []
+            offense = away_id if offense == home_id else home_id
+    if plays:
+        drives.append({"team": {"id": offense}, "plays": plays})
+    return {
+        "header": {"competitions": [{
+            "status": {"type": {"state": state}},
+            "competitors": [
+                {"homeAway": "home", "team": {"id": home_id, "abbreviation": "ALA",
+                                              "displayName": "Alabama Crimson Tide"}},
+                {"homeAway": "away", "team": {"id": away_id, "abbreviation": "AUB",
+                                              "displayName": "Auburn Tigers"}},
+            ],
+        }]},
+        "drives": {"previous": drives},
+    }
+
+
+def make_raw_summaries(n_games, n_plays=180):
+    """List of (raw_bytes, league) jobs, one per synthetic game."""
+    return [(json.dumps(make_summary(str(401000000 + i), n_plays, seed=i)).encode(), "cfb")
+            for i in range(n_games)]
@@ -0,0 +1,148 @@
+"""
+CAPP Client
+HTTP client for the CAPP data server shared by the desktop tools (QC
+Monitor, Game Viewer).  One pooled keep-alive session per client, so calls
+reuse connections instead of paying a TCP + TLS handshake each; gzip
+responses; short retries on connection errors and 502-504; the API key
+from CAPP_API_KEY; and conditional GETs — a response that carried an ETag
+is remembered, revalidated with If-None-Match, and a 304 answer is served
+from that copy.
+
+    client = CappClient()
+    data = client.plays(game_id, league)          # 304-aware
+    results = client.fetch_many([("/game/1/plays", None), ...])
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SERVER_URL = os.environ.get("CAPP_SERVER_URL", "https://capp-data-server.onrender.com")
+API_KEY    = os.environ.get("CAPP_API_KEY", "")
+
+CLIENT_POOL_SIZE = 8      # keep-alive connections, and fetch_many requests in flight
+CLIENT_RETRIES   = 2      # per request, on connection errors and 502 / 503 / 504
+CLIENT_CACHE     = 256    # ETag'd responses remembered for conditional GETs
+
+
+class CappClient:
+    def __init__(self, base_url=SERVER_URL, api_key=API_KEY,
+                 pool_size=CLIENT_POOL_SIZE, retries=CLIENT_RETRIES, cache_size=CLIENT_CACHE):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        # The server's 503 carries Retry-After: 30 while ESPN is unavailable;
+        # a UI thread should report that rather than sleep through it.
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({"GET", "HEAD", "DELETE"}),
+                      respect_retry_after_header=False, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        if api_key:
+            self.session.headers["X-API-Key"] = api_key
+        self._cache = OrderedDict()     # (path, params) -> (etag, data)
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="capp-client")
+        self.stats = {"requests": 0, "not_modified": 0}
+        self.client_id = uuid.uuid4().hex[:12]      # identifies this client's interest leases
+
+    # ─── Requests ────────────────────────────────────────────
+
+    def get(self, path, params=None, timeout=15, conditional=False):
+        """GET `path` and return the decoded JSON.  With `conditional`, a
+        previously seen ETag is sent and a 304 returns the cached body."""
+        key = (path, _freeze(params))
+        headers = {}
+        if conditional:
+            with self._lock:
+                cached = self._cache.get(key)
+            if cached is not None:
+                headers["If-None-Match"] = cached[0]
+        r = self.session.get(self.base_url + path, params=params, headers=headers, timeout=timeout)
+        with self._lock:
+            self.stats["requests"] += 1
+        if conditional and r.status_code == 304 and cached is not None:
+            with self._lock:
+                self.stats["not_modified"] += 1
+                self._cache.move_to_end(key)
+            return cached[1]
+        r.raise_for_status()
+        data = r.json()
+        etag = r.headers.get("ETag")
+        if conditional and etag:
+            with self._lock:
+                self._cache[key] = (etag, data)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return data
+
+    def post(self, path, params=None, timeout=15):
+        r = self.session.post(self.base_url + path, params=params, timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def delete(self, path, params=None, timeout=15):
+        r = self.session.delete(self.base_url + path, params=params, timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def fetch_many(self, calls, timeout=20, conditional=True):
+        """GET every (path, params) in `calls` with at most pool_size in
+        flight.  Returns results in order; a failed call's slot holds its
+        exception instead of raising."""
+        def one(call):
+            path, params = call
+            try:
+                return self.get(path, params, timeout=timeout, conditional=conditional)
+            except Exception as e:
+                return e
+        return list(self._pool.map(one, calls))
+
+    # ─── Endpoints ───────────────────────────────────────────
+
+    def health(self, timeout=60):
+        return self.get("/health", timeout=timeout)
+
+    def games(self, timeout=15, **params):
+        return self.get("/games", params=params, timeout=timeout)
+
+    def plays(self, game_id, league="cfb", timeout=20):
+        return self.get(f"/game/{game_id}/plays", params={"league": league},
+                        timeout=timeout, conditional=True)
+
+    def version(self, game_id, timeout=10):
+        return self.get(f"/game/{game_id}/version", timeout=timeout).get("fetched_at")
+
+    def interest(self, game_id, lease=60, timeout=10):
+        """Lease (or renew) interest in a game: the server polls subscribed
+        live games at its fast cadence until the lease runs out."""
+        return self.post(f"/game/{game_id}/interest",
+                         params={"client_id": self.client_id, "lease": lease}, timeout=timeout)
+
+    def release_interest(self, game_id, timeout=10):
+        return self.delete(f"/game/{game_id}/interest",
+                           params={"client_id": self.client_id}, timeout=timeout)
+
+    def alerts(self, since=None, game_ids=None, timeout=15):
+        params = {}
+        if since is not None:
+            params["since"] = since
+        if game_ids:
+            params["game_id"] = list(game_ids)
+        return self.get("/alerts", params=params, timeout=timeout)
+
+
+def _freeze(params):
+    if not params:
+        return ()
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()))
@@ -4,9 +4,24 @@ Ports the complete mapping logic from CAPP's espn_live.py so the server
 returns fully CAPP-ready play entries to clients.
 """
 
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
 import requests
 import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+
+import poll_shards
+import qc_engine
+import response_archive
+import shared_store
+import upstream
 
 # ============================================================
 # ESPN API URLs
@@ -19,7 +34,92 @@ NFL_SUMMARY_URL    = "https://site.api.espn.com/apis/site/v2/sports/football/nfl
 REQUEST_TIMEOUT = 15
 POLL_INTERVAL   = 30
 
+# A live game's summary is re-fetched only when its scoreboard tuple (status,
+# period, clock, scores) changed, or when this many seconds have passed since
+# the last summary fetch — catches corrections that don't move the scoreboard.
+SUMMARY_MAX_STALENESS = int(os.environ.get("CAPP_SUMMARY_MAX_STALENESS", "120"))
+
+# A live game whose play count hasn't grown for this many seconds (halftime
+# aside) gets a "stalled" QC alert.  Judged by the poller: a frozen feed
+# sends the same body every time, so nothing is ever re-mapped to check.
+STALL_ALERT_AFTER = int(os.environ.get("CAPP_STALL_ALERT_AFTER", "300"))
+
+# While a league's scoreboard call keeps failing its last good snapshot is
+# reused, for at most this many seconds; after that its games are dropped
+# rather than polled as "live" forever.
+SCOREBOARD_MAX_REUSE = int(os.environ.get("CAPP_SCOREBOARD_MAX_REUSE", "300"))
+
+# Bump whenever the mapping pipeline (map_espn_play, _auto_fix_entries,
+# _fill_scoring_gaps, _qc_flag_entries, ...) changes its output.  Cached
+# results carry this tag; remap_archived_games() rebuilds outdated ones from
+# the raw response archive without any ESPN traffic.
+PIPELINE_VERSION = 1
+
+# Worker processes used by the poller for JSON decode + mapping (CPU-bound,
+# so threads would serialize on the GIL).  0 = map inline in the poller thread.
+MAP_WORKERS = int(os.environ.get("CAPP_MAP_WORKERS", "0"))
+
+# Shared-cache mode for running several uvicorn workers: path to a SQLite file
+# all processes share.  Exactly one process (holder of "<path>.leader") polls
+# ESPN; every process reads games/plays from the shared file.  "" = off.
+SHARED_CACHE_PATH = os.environ.get("CAPP_SHARED_CACHE", "")
+
+# With a shared cache, CAPP_POLL_SHARDED=1 makes every poller worker own a
+# consistent-hash slice of the live games instead of one leader polling all.
+POLL_SHARDED = os.environ.get("CAPP_POLL_SHARDED", "") == "1"
+
+# Interest-based cadence: clients lease interest in game ids (POST
+# /game/{id}/interest).  Subscribed live games are polled every
+# INTEREST_POLL_INTERVAL s, the rest at most every BACKGROUND_POLL_INTERVAL s
+# (by default the plain POLL_INTERVAL, so unsubscribed games are polled no
+# less often than before interest existed).
+INTEREST_POLL_INTERVAL   = int(os.environ.get("CAPP_INTEREST_POLL_INTERVAL", "10"))
+BACKGROUND_POLL_INTERVAL = int(os.environ.get("CAPP_BACKGROUND_POLL_INTERVAL", str(POLL_INTERVAL)))
+INTEREST_LEASE_DEFAULT   = 60
+INTEREST_LEASE_MAX       = 600
+
+# Kickoff pre-warm: scheduled games get one warm summary fetch PREWARM_LEAD s
+# before the scoreboard kickoff time and another at kickoff, so the cache,
+# name lookups and upstream connections are hot for the first operator.
+# Games still "pre" more than PREWARM_GRACE s after kickoff are left alone.
+PREWARM_LEAD  = int(os.environ.get("CAPP_PREWARM_LEAD", "300"))
+PREWARM_GRACE = 900
+
+# Stale-while-revalidate: how long a cached result counts as fresh, per game
+# status, e.g. CAPP_FRESHNESS="in=15,pre=300,post=3600".  Older results are
+# still served immediately, flagged stale, while a background refresh runs.
+# A live game's bound is never shorter than its poll cadence (see
+# _freshness_bound), so requests don't duplicate the poller's fetches.
+def _parse_freshness(raw):
+    bounds = {"in": 15, "pre": 300, "post": 3600}
+    for part in raw.split(","):
+        status, _, secs = part.partition("=")
+        if status.strip() and secs.strip():
+            bounds[status.strip()] = int(secs)
+    return bounds
+
+FRESHNESS_BOUNDS = _parse_freshness(os.environ.get("CAPP_FRESHNESS", ""))
+
+# All ESPN traffic goes through one governor: a process-wide token bucket
+# (CAPP_UPSTREAM_RATE req/s), a circuit breaker per endpoint and jittered
+# retries drawn from a shared retry budget — see upstream.py.  The rate is a
+# total for the deployment: in shared-cache mode every process (uvicorn
+# worker or poller_worker.py) heartbeats into the store and takes an equal
+# share of rate and burst, rescaled as processes come and go.
+UPSTREAM_RATE  = float(os.environ.get("CAPP_UPSTREAM_RATE", "8"))
+UPSTREAM_BURST = int(os.environ.get("CAPP_UPSTREAM_BURST", "16"))
+UPSTREAM_MEMBER_TTL = POLL_INTERVAL * 3    # a process unseen this long drops out of the split
+
+# Per-fetch time budgets (s).  A client's cold /plays request gives up after
+# COLD_FETCH_BUDGET instead of the full REQUEST_TIMEOUT; each poller summary
+# fetch gets POLL_FETCH_BUDGET so one stalled game can't hold up the cycle.
+# Summary fetches are hedged past the observed p95 latency.
+COLD_FETCH_BUDGET = float(os.environ.get("CAPP_COLD_FETCH_BUDGET", "8"))
+POLL_FETCH_BUDGET = float(os.environ.get("CAPP_POLL_FETCH_BUDGET", "6"))
+
 _session = requests.Session()
+_upstream = upstream.UpstreamGovernor(_session, rate=UPSTREAM_RATE, burst=UPSTREAM_BURST,
+                                      acquire_timeout=REQUEST_TIMEOUT)
 
 # ============================================================
 # Team Name Data (ported from espn_live.py)
@@ -246,10 +346,53 @@ _games_cache = []   # list of game info dicts
 _plays_cache = {}   # game_id -> mapped result dict
 _lock = threading.Lock()
 
+# Games change feed (/games?since=).  Each scoreboard publish that differs
+# from the previous list gets a new version — a ms timestamp, so versions
+# keep increasing across restarts — and an {added, removed, changed} entry.
+GAMES_FEED_HISTORY = 120        # change entries retained
+_games_version = 0
+_games_log = deque(maxlen=GAMES_FEED_HISTORY)
+_last_good_scoreboard = {}      # league -> (time, games) of its last successful scoreboard
+
+_interest = {}      # game_id -> {client_id: lease expiry (unix time)}
+_subscribers_seen = (0.0, {})   # (time taken, _subscriber_counts()) — see _recent_subscriber_counts
+_validated_at = {}  # game_id -> last time upstream confirmed the cached result
+_refreshing = {}    # game_id -> threading.Event of its in-flight background refresh
+_cold_fetches = {}  # game_id -> Future of its in-flight first fetch
+_store = None       # shared_store.SQLiteStore in shared-cache mode, else None
+_store_lock = threading.Lock()
+
+# Upstream validators per game, remembered from the last mapped summary:
+#   game_id -> {"etag": str, "last_modified": str, "digest": str}
+# Lets the poller skip JSON decode + mapping when ESPN sends the same bytes.
+_upstream_validators = {}
+_poll_stats = {
+    "summary_fetches":   0,   # live summary fetches issued by the poller
+    "summary_unchanged": 0,   # ...of which upstream was unchanged (no re-map)
+    "summary_skipped":   0,   # live games not fetched — scoreboard unchanged
+    "last_cycle_ms":     0,   # wall time of the last full poll cycle
+    "last_map_ms":       0,   # ...of which decode + mapping
+    "last_mapped":       0,   # summaries mapped in the last cycle
+    "map_workers":       0,
+    "prewarm_fetches":   0,   # warm fetches of scheduled games near kickoff
+}
+
+# Scoreboard gating: game_id -> scoreboard tuple / time seen at the last
+# successful poller summary fetch.  Only touched by the poller thread.
+_scoreboard_snapshots = {}
+_summary_polled_at = {}
+_play_progress = {}     # live game_id -> [play count, time it last grew, stall reported]
+
+_map_pool = None
+_map_pool_lock = threading.Lock()
+
+_prewarmed = {}     # game_id -> {"lead", "kickoff"} warm phases already done
+
 # ============================================================
 # Team Name Utilities
 # ============================================================
 
+@functools.lru_cache(maxsize=2048)
 def espn_name_to_capp_name(espn_display_name, league="cfb"):
     if not espn_display_name:
         return None
@@ -967,14 +1110,16 @@ def _week_to_date_range(season, week, seasontype=None):
     return f"{dates[0]}-{dates[1]}"
 
 def _fetch_scoreboard(league, params):
+    """Return the scoreboard's events, or None if the call failed — callers
+    must not mistake an outage for a day with no games."""
     url = NFL_SCOREBOARD_URL if league == "nfl" else CFB_SCOREBOARD_URL
     try:
-        r = _session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        r = _upstream.get("scoreboard", url, params=params, timeout=REQUEST_TIMEOUT)
         r.raise_for_status()
         return r.json().get("events", [])
     except Exception as e:
         print(f"Scoreboard error ({league}): {e}")
-        return []
+        return None
 
 def _events_to_games(events, league):
     games = []
@@ -1039,19 +1184,87 @@ def _fetch_historical_games(league, year, week, seasontype=2):
             date_range = _week_to_date_range(year, week, seasontype if seasontype == 3 else None)
             params = {"dates": date_range} if date_range else {}
         events = _fetch_scoreboard(lg, params)
-        results.extend(_events_to_games(events, lg))
+        results.extend(_events_to_games(events or [], lg))
     return results
 
 # ============================================================
 # Play Fetching + Full Mapping Pipeline
 # ============================================================
 
-def _fetch_game_plays_mapped(game_id, league="cfb"):
+def _fetch_summary_raw(game_id, league="cfb", skip_unchanged=False, deadline=None):
+    """
+    Fetch a game summary from ESPN without decoding it.
+    Returns (raw_bytes, validators), or None when skip_unchanged is set and
+    upstream is unchanged.  `deadline` is an absolute time.monotonic() the
+    fetch must finish by (default: REQUEST_TIMEOUT from now).
+
+    With skip_unchanged=True (used by the poller) the request carries the
+    ETag / Last-Modified validators remembered for this game, and the raw
+    body is hashed before decoding.  If ESPN answers 304 or returns the same
+    bytes as last time the cached result stays valid.  Validators are only
+    consulted while the game is cached on the current PIPELINE_VERSION.
+    """
     url = NFL_SUMMARY_URL if league == "nfl" else CFB_SUMMARY_URL
-    r = _session.get(url, params={"event": game_id}, timeout=REQUEST_TIMEOUT)
+    known = None
+    if skip_unchanged:
+        cached = _cached_plays(game_id)
+        if cached and cached.get("pipeline_version") == PIPELINE_VERSION:
+            with _lock:
+                known = _upstream_validators.get(game_id)
+
+    headers = {}
+    if known:
+        if known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+
+    r = _upstream.get("summary", url, params={"event": game_id}, headers=headers,
+                      timeout=REQUEST_TIMEOUT, deadline=deadline, hedge=True)
+    if known and r.status_code == 304:
+        return None
     r.raise_for_status()
-    data = r.json()
 
+    raw = r.content
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    if known and known.get("digest") == digest:
+        return None
+    return raw, {
+        "etag":          r.headers.get("ETag", ""),
+        "last_modified": r.headers.get("Last-Modified", ""),
+        "digest":        digest,
+    }
+
+def _record_upstream(game_id, league, raw, validators, result):
+    """Archive a freshly mapped raw body and remember its validators.
+    Called only after mapping succeeded, so a body that fails to map is
+    retried on the next poll rather than skipped as unchanged."""
+    try:
+        response_archive.archive_response(game_id, league, raw, result["fetched_at"])
+    except OSError as e:
+        print(f"Archive error ({game_id}): {e}")
+    with _lock:
+        _upstream_validators[game_id] = validators
+
+def _fetch_game_plays_mapped(game_id, league="cfb", skip_unchanged=False, deadline=None):
+    """Fetch a game summary from ESPN and run the full mapping pipeline.
+    Returns None only when skip_unchanged is set and upstream is unchanged."""
+    fetched = _fetch_summary_raw(game_id, league, skip_unchanged, deadline)
+    if fetched is None:
+        _mark_validated(game_id)
+        return None
+    raw, validators = fetched
+    result = _map_raw(raw, league)
+    _record_upstream(game_id, league, raw, validators, result)
+    return result
+
+def _map_raw(raw, league="cfb"):
+    """Decode + map one raw summary body.  Module-level so it can run in a
+    mapping worker process."""
+    return _map_summary(json.loads(raw), league)
+
+def _map_summary(data, league="cfb"):
+    """Map a decoded ESPN summary response to the CAPP result dict."""
     home_team_id = away_team_id = None
     home_team_name = away_team_name = ""
     home_team_abbrev = away_team_abbrev = ""
@@ -1149,41 +1362,581 @@ def _fetch_game_plays_mapped(game_id, league="cfb"):
         "status":     game_status,
         "league":     league,
         "fetched_at": time.time(),   # unix timestamp — clients poll this to detect changes
+        "pipeline_version": PIPELINE_VERSION,
     }
 
+# ============================================================
+# Archive Re-Mapping
+# ============================================================
+
+def map_archived_response(game_id, league=None, at=None):
+    """
+    Re-run the current pipeline over an archived raw summary — the newest one
+    taken at or before `at` (unix seconds; None = newest).  No network
+    traffic.  Returns None when nothing is archived for the game.
+    """
+    league = league or response_archive.find_league(game_id)
+    if not league:
+        return None
+    snap = response_archive.load_response(game_id, league, at)
+    if snap is None:
+        return None
+    archived_at, raw = snap
+    result = _map_summary(json.loads(raw), league)
+    result["archived_at"] = archived_at
+    return result
+
+_remap_status = {"running": False, "started_at": 0, "finished_at": 0,
+                 "checked": 0, "remapped": 0, "errors": 0}
+
+def remap_archived_games(game_ids=None, force=False):
+    """
+    Batch job: rebuild cached results from the archive after a pipeline
+    change.  By default only games currently cached with an outdated
+    PIPELINE_VERSION tag are rebuilt, from their newest snapshot — games
+    that aged out of the cache stay out of it.  force=True also rebuilds
+    cached games already on the current pipeline; game_ids names games to
+    rebuild whether cached or not.  Rebuilt results are published without
+    QC alerting: re-running the rules over old games is not news to the
+    desks watching live ones.  Returns the final status dict.
+    """
+    with _lock:
+        if _remap_status["running"]:
+            return dict(_remap_status)
+        _remap_status.update(running=True, started_at=time.time(), finished_at=0,
+                             checked=0, remapped=0, errors=0)
+    wanted = {str(g) for g in game_ids} if game_ids else None
+    try:
+        for league, gid in response_archive.archived_games():
+            if wanted is not None and gid not in wanted:
+                continue
+            with _lock:
+                _remap_status["checked"] += 1
+            if wanted is None:
+                cached = _cached_plays(gid)
+                if cached is None:
+                    continue
+                if not force and cached.get("pipeline_version") == PIPELINE_VERSION:
+                    continue
+            try:
+                result = map_archived_response(gid, league)
+            except Exception as e:
+                print(f"Remap error ({gid}): {e}")
+                with _lock:
+                    _remap_status["errors"] += 1
+                continue
+            if result is None:
+                continue
+            _publish_plays(gid, result, check=False)
+            with _lock:
+                _upstream_validators.pop(gid, None)   # next poll re-validates from scratch
+                _remap_status["remapped"] += 1
+    finally:
+        with _lock:
+            _remap_status.update(running=False, finished_at=time.time())
+    with _lock:
+        return dict(_remap_status)
+
+def start_remap(game_ids=None, force=False):
+    """Run remap_archived_games() on a background thread."""
+    threading.Thread(target=remap_archived_games, args=(game_ids, force), daemon=True).start()
+
+def get_remap_status():
+    with _lock:
+        return dict(_remap_status)
+
 # ============================================================
 # Live Polling
 # ============================================================
 
-def _poll_loop():
-    while True:
-        new_games = []
-        for league in ["cfb", "nfl"]:
+def _scoreboard_tuple(game):
+    return (game["status"], game["period"], game["clock"],
+            game["home_score"], game["away_score"])
+
+def _kickoff_time(game):
+    """Unix kickoff time from the scoreboard date (e.g. "2025-09-06T16:00Z"),
+    or None when missing/unparseable."""
+    raw = game.get("date", "")
+    for fmt in ("%Y-%m-%dT%H:%MZ", "%Y-%m-%dT%H:%M:%SZ"):
+        try:
+            return datetime.strptime(raw, fmt).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            continue
+    return None
+
+def _prewarm_phase(game, now):
+    """Return the warm phase ("lead" or "kickoff") a scheduled game is due
+    for, or None."""
+    kickoff = _kickoff_time(game)
+    if kickoff is None or not (kickoff - PREWARM_LEAD <= now <= kickoff + PREWARM_GRACE):
+        return None
+    phase = "kickoff" if now >= kickoff else "lead"
+    if phase in _prewarmed.get(game["game_id"], ()):
+        return None
+    return phase
+
+def _game_cadence(subscribers):
+    return INTEREST_POLL_INTERVAL if subscribers else BACKGROUND_POLL_INTERVAL
+
+def _summary_due(game, subscribers=0):
+    """True when the poller should fetch this live game's summary: it is not
+    cached yet, or its cadence interval has elapsed and either its scoreboard
+    tuple moved since the last fetch or that fetch is older than
+    SUMMARY_MAX_STALENESS."""
+    gid = game["game_id"]
+    if _cached_plays(gid) is None:
+        return True
+    age = time.time() - _summary_polled_at.get(gid, 0)
+    if age < _game_cadence(subscribers):
+        return False
+    return (_scoreboard_snapshots.get(gid) != _scoreboard_tuple(game)
+            or age >= SUMMARY_MAX_STALENESS)
+
+def _note_plays(game_id, count):
+    """Record a live game's play count after a re-map; a change restarts
+    its stall clock."""
+    progress = _play_progress.get(game_id)
+    if progress is None or progress[0] != count:
+        _play_progress[game_id] = [count, time.time(), False]
+
+def _check_stalls(live):
+    """Raise one "stalled" alert per play count for each live game whose
+    plays haven't grown for STALL_ALERT_AFTER s — whether its summary was
+    re-mapped, unchanged upstream, or skipped on an idle scoreboard."""
+    now = time.time()
+    for g in live:
+        gid = g["game_id"]
+        progress = _play_progress.get(gid)
+        if progress is None:
+            cached = _cached_plays(gid)
+            _note_plays(gid, len(cached.get("entries", [])) if cached else 0)
+            continue
+        if "half" in g.get("status_detail", "").lower():
+            progress[1] = now          # halftime is not a stall
+            continue
+        count, since, reported = progress
+        if reported or count == 0 or now - since < STALL_ALERT_AFTER:
+            continue
+        progress[2] = True
+        try:
+            qc_engine.report_stall(gid, _cached_plays(gid) or {}, count, now - since)
+        except Exception as e:
+            print(f"QC engine error ({gid}): {e}")
+
+def _mapping_pool():
+    """Lazily create the mapping process pool; None when MAP_WORKERS is 0."""
+    global _map_pool
+    if MAP_WORKERS <= 0:
+        return None
+    with _map_pool_lock:
+        if _map_pool is None:
+            # spawn, not fork: the parent runs request and poller threads
+            _map_pool = ProcessPoolExecutor(max_workers=MAP_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _map_pool
+
+def _shutdown_mapping_pool():
+    global _map_pool
+    with _map_pool_lock:
+        pool, _map_pool = _map_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _map_raw_batch(jobs):
+    """
+    Map a batch of (raw_bytes, league) jobs.  Runs in the worker pool when
+    MAP_WORKERS > 0, otherwise inline.  Returns one item per job, in order:
+    the mapped result dict, or the Exception raised while mapping it.
+    """
+    pool = _mapping_pool()
+    if pool is None:
+        results = []
+        for raw, league in jobs:
             try:
-                events = _fetch_scoreboard(league, {})
-                games = _events_to_games(events, league)
-                new_games.extend(games)
-                for g in games:
-                    if g["status"] == "in":
-                        try:
-                            mapped = _fetch_game_plays_mapped(g["game_id"], league)
-                            with _lock:
-                                _plays_cache[g["game_id"]] = mapped
-                        except Exception as e:
-                            print(f"Live plays error ({g['game_id']}): {e}")
+                results.append(_map_raw(raw, league))
             except Exception as e:
-                print(f"Poll error ({league}): {e}")
+                results.append(e)
+        return results
+
+    futures = [pool.submit(_map_raw, raw, league) for raw, league in jobs]
+    results = []
+    for fut in futures:
+        try:
+            results.append(fut.result())
+        except Exception as e:
+            results.append(e)
+    if any(isinstance(r, BrokenProcessPool) for r in results):
+        _shutdown_mapping_pool()   # a worker died — start a fresh pool next cycle
+    return results
 
+def _fetch_live_scoreboards():
+    """Fetch both leagues' current scoreboards.  Returns the games list.
+    A league whose scoreboard call fails keeps its last good snapshot, so
+    its games don't vanish from /games for a cycle — but only for
+    SCOREBOARD_MAX_REUSE s."""
+    new_games = []
+    for league in ["cfb", "nfl"]:
+        games = None
+        try:
+            events = _fetch_scoreboard(league, {})
+            if events is not None:
+                games = _events_to_games(events, league)
+        except Exception as e:
+            print(f"Poll error ({league}): {e}")
+        if games is None:
+            saved_at, games = _last_good_scoreboard.get(league, (0, []))
+            if time.time() - saved_at > SCOREBOARD_MAX_REUSE:
+                _last_good_scoreboard.pop(league, None)
+                games = []
+        else:
+            _last_good_scoreboard[league] = (time.time(), games)
+        new_games.extend(games)
+    return new_games
+
+def _poll_cycle(shard=None, refresh_scoreboard=True):
+    """
+    One poll pass.  Unsharded, this process fetches the scoreboards and every
+    live game that is due.  With a shard, only the leader fetches the
+    scoreboards (the others read the published list) and each shard polls
+    only the live games it owns on the hash ring.
+    """
+    cycle_start = time.perf_counter()
+    if refresh_scoreboard and (shard is None or shard.is_leader()):
+        new_games = _fetch_live_scoreboards()
+        _publish_games(new_games)
+    else:
+        new_games = _cached_games()
+    subscribers = _recent_subscriber_counts(refresh=True)
+
+    live = [g for g in new_games if g["status"] == "in"]
+    scheduled = [g for g in new_games if g["status"] == "pre"]
+    if shard is not None:
+        live = [g for g in live if shard.owns(g["game_id"])]
+        scheduled = [g for g in scheduled if shard.owns(g["game_id"])]
+        shard.owned = len(live)
+    due = []
+    now = time.time()
+    for g in scheduled:
+        phase = _prewarm_phase(g, now)
+        if phase:
+            _prewarmed.setdefault(g["game_id"], set()).add(phase)
+            due.append(g)
+            with _lock:
+                _poll_stats["prewarm_fetches"] += 1
+    scheduled_ids = {g["game_id"] for g in scheduled}
+    for gid in list(_prewarmed):
+        if gid not in scheduled_ids:
+            del _prewarmed[gid]
+    for g in live:
+        if _summary_due(g, subscribers.get(g["game_id"], 0)):
+            due.append(g)
+        else:
+            with _lock:
+                _poll_stats["summary_skipped"] += 1
+
+    # Fetch phase — raw bytes only; unchanged bodies drop out here
+    pending = []
+    for g in due:
+        try:
+            fetched = _fetch_summary_raw(g["game_id"], g["league"], skip_unchanged=True,
+                                         deadline=time.monotonic() + POLL_FETCH_BUDGET)
+        except Exception as e:
+            print(f"Live plays error ({g['game_id']}): {e}")
+            continue
         with _lock:
-            _games_cache.clear()
-            _games_cache.extend(new_games)
+            _poll_stats["summary_fetches"] += 1
+            if fetched is None:
+                _poll_stats["summary_unchanged"] += 1
+        if fetched is None:
+            _mark_validated(g["game_id"])
+            _scoreboard_snapshots[g["game_id"]] = _scoreboard_tuple(g)
+            _summary_polled_at[g["game_id"]] = time.time()
+        else:
+            pending.append((g, fetched[0], fetched[1]))
+
+    # Map phase — inline or across the worker pool
+    map_start = time.perf_counter()
+    results = _map_raw_batch([(raw, g["league"]) for g, raw, _ in pending])
+    map_ms = (time.perf_counter() - map_start) * 1000
+    for (g, raw, validators), result in zip(pending, results):
+        if isinstance(result, Exception):
+            print(f"Live plays error ({g['game_id']}): {result}")
+            continue
+        _record_upstream(g["game_id"], g["league"], raw, validators, result)
+        _publish_plays(g["game_id"], result)
+        _note_plays(g["game_id"], len(result.get("entries", [])))
+        _scoreboard_snapshots[g["game_id"]] = _scoreboard_tuple(g)
+        _summary_polled_at[g["game_id"]] = time.time()
+    _check_stalls(live)
+
+    # Forget gating state for games that ended or moved to another shard
+    live_ids = {g["game_id"] for g in live}
+    for gid in list(_scoreboard_snapshots):
+        if gid not in live_ids:
+            _scoreboard_snapshots.pop(gid, None)
+            _summary_polled_at.pop(gid, None)
+    for gid in list(_play_progress):
+        if gid not in live_ids:
+            del _play_progress[gid]
 
+    with _lock:
+        _poll_stats["last_cycle_ms"] = round((time.perf_counter() - cycle_start) * 1000, 1)
+        _poll_stats["last_map_ms"]   = round(map_ms, 1)
+        _poll_stats["last_mapped"]   = len(pending)
+        _poll_stats["map_workers"]   = MAP_WORKERS
+        stats = dict(_poll_stats)
+    store = _shared_store()
+    if store is not None:
+        stats["pid"] = os.getpid()
+        key = "poll_stats" if shard is None else f"poll_stats:{shard.worker_id}"
+        store.put(key, stats)
+
+def _poll_loop(shard=None):
+    """Tick every INTEREST_POLL_INTERVAL s.  Scoreboards are re-fetched every
+    tick while any client holds an interest lease, otherwise every
+    POLL_INTERVAL s; per-game cadence is decided in _summary_due."""
+    last_prune = 0
+    last_scoreboard = 0
+    while True:
+        if time.time() - last_prune >= 3600:
+            last_prune = time.time()
+            try:
+                response_archive.prune_archive()
+                qc_engine.prune_alerts()
+                qc_engine.forget_games(g["game_id"] for g in _cached_games()
+                                       if g["status"] == "in")
+            except Exception as e:
+                print(f"Prune error: {e}")
+        if shard is not None:
+            shard.heartbeat()
+        try:
+            _share_upstream_rate()
+        except Exception as e:
+            print(f"Upstream rate share error: {e}")
+        refresh = (bool(_subscriber_counts())
+                   or time.time() - last_scoreboard >= POLL_INTERVAL)
+        if refresh:
+            last_scoreboard = time.time()
+        try:
+            _poll_cycle(shard, refresh_scoreboard=refresh)
+        except Exception as e:
+            print(f"Poll cycle error: {e}")
+        time.sleep(min(INTEREST_POLL_INTERVAL, POLL_INTERVAL))
+
+def _share_upstream_rate():
+    """Shared-cache mode: heartbeat this process into the store and set its
+    token bucket to an equal share of UPSTREAM_RATE / UPSTREAM_BURST across
+    every process seen within UPSTREAM_MEMBER_TTL.  Returns the share count.
+    A process that joins is counted by the others on their next heartbeat,
+    so the total can briefly run over by one share."""
+    store = _shared_store()
+    if store is None:
+        return 1
+    now = time.time()
+    store.put(f"upstream:{os.getpid()}", now)
+    members = 0
+    for key, seen in store.items("upstream:").items():
+        if now - seen > UPSTREAM_MEMBER_TTL:
+            store.delete(key)
+        else:
+            members += 1
+    members = max(members, 1)
+    _upstream.bucket.set_rate(UPSTREAM_RATE / members, max(1.0, UPSTREAM_BURST / members))
+    return members
+
+def _leader_loop():
+    """Shared-cache mode: wait until this process holds the leader lock, then
+    poll.  A follower keeps retrying so it takes over if the leader exits."""
+    lock = shared_store.LeaderLock(SHARED_CACHE_PATH + ".leader")
+    while not lock.try_acquire():
+        try:
+            _share_upstream_rate()
+        except Exception as e:
+            print(f"Upstream rate share error: {e}")
         time.sleep(POLL_INTERVAL)
+    print(f"Poller leader elected (pid {os.getpid()})")
+    _poll_loop()
+
+def run_shard(worker_id=None):
+    """
+    Sharded mode: join the hash ring in the shared store and poll only this
+    worker's slice of live games, forever.  Used by start_poller() when
+    CAPP_POLL_SHARDED=1 and by poller_worker.py for standalone processes.
+    """
+    store = _shared_store()
+    if store is None:
+        raise RuntimeError("Sharded polling requires CAPP_SHARED_CACHE")
+    shard = poll_shards.Shard(store, shared_store.LeaderLock(SHARED_CACHE_PATH + ".leader"),
+                              worker_id=worker_id, ttl=POLL_INTERVAL * 3)
+    try:
+        _poll_loop(shard)
+    finally:
+        shard.leave()
 
 def start_poller():
-    t = threading.Thread(target=_poll_loop, daemon=True)
+    if SHARED_CACHE_PATH and POLL_SHARDED:
+        target = run_shard
+    elif SHARED_CACHE_PATH:
+        target = _leader_loop
+    else:
+        target = _poll_loop
+    t = threading.Thread(target=target, daemon=True)
     t.start()
 
+# ============================================================
+# Cache Access (local dicts, or the shared store)
+# ============================================================
+
+def _shared_store():
+    """The shared SQLite store in shared-cache mode, else None."""
+    global _store
+    if not SHARED_CACHE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = shared_store.SQLiteStore(SHARED_CACHE_PATH)
+        return _store
+
+def _cached_plays(game_id):
+    store = _shared_store()
+    if store is not None:
+        return store.get(f"plays:{game_id}")
+    with _lock:
+        return _plays_cache.get(game_id)
+
+def _publish_plays(game_id, result, check=True):
+    """Cache a freshly mapped result and, with `check`, run the QC engine
+    over it.  Request-driven fetches (cold loads, background refreshes)
+    check only live games: the rest are old games an operator is browsing,
+    and alerts for those are noise on /alerts.  A live result must still be
+    checked — the poller would see its body as unchanged and skip it."""
+    store = _shared_store()
+    if store is not None:
+        store.put(f"plays:{game_id}", result)
+    else:
+        with _lock:
+            _plays_cache[game_id] = result
+    if not check:
+        return
+    try:
+        qc_engine.check_game(game_id, result)
+    except Exception as e:
+        print(f"QC engine error ({game_id}): {e}")
+
+def _mark_validated(game_id):
+    """Record that upstream still matches the cached result (304 / same bytes)
+    so its age counts from now, not from when it was last mapped."""
+    store = _shared_store()
+    if store is not None:
+        store.put(f"validated:{game_id}", time.time())
+        return
+    with _lock:
+        _validated_at[game_id] = time.time()
+
+def _data_age(game_id, cached):
+    store = _shared_store()
+    if store is not None:
+        validated = store.get(f"validated:{game_id}", 0)
+    else:
+        with _lock:
+            validated = _validated_at.get(game_id, 0)
+    return time.time() - max(cached.get("fetched_at", 0), validated)
+
+def _cached_games():
+    store = _shared_store()
+    if store is not None:
+        return list(store.get("games", []))
+    with _lock:
+        return list(_games_cache)
+
+def _diff_games(old, new):
+    old_by_id = {g["game_id"]: g for g in old}
+    new_by_id = {g["game_id"]: g for g in new}
+    added   = [g for gid, g in new_by_id.items() if gid not in old_by_id]
+    changed = [g for gid, g in new_by_id.items() if gid in old_by_id and old_by_id[gid] != g]
+    removed = [{"game_id": gid, "league": g["league"]}
+               for gid, g in old_by_id.items() if gid not in new_by_id]
+    return added, removed, changed
+
+def _publish_games(games):
+    """Replace the games list and, if it differs from the previous one,
+    append a versioned change entry to the feed."""
+    added, removed, changed = _diff_games(_cached_games(), games)
+    if not (added or removed or changed):
+        return
+    store = _shared_store()
+    if store is not None:
+        version = max(store.get("games_version", 0) + 1, int(time.time() * 1000))
+        store.put(f"games_change:{version:015d}",
+                  {"version": version, "added": added, "removed": removed, "changed": changed})
+        store.put("games", games)
+        store.put("games_version", version)
+        for key in sorted(store.items("games_change:"))[:-GAMES_FEED_HISTORY]:
+            store.delete(key)
+        return
+    global _games_version
+    with _lock:
+        _games_version = max(_games_version + 1, int(time.time() * 1000))
+        _games_log.append({"version": _games_version, "added": added,
+                           "removed": removed, "changed": changed})
+        _games_cache.clear()
+        _games_cache.extend(games)
+
+def _games_feed_since(since):
+    """(current version, oldest retained version or None, change entries
+    newer than `since`, current games)."""
+    store = _shared_store()
+    if store is not None:
+        version = store.get("games_version", 0)
+        log = [entry for _, entry in sorted(store.items("games_change:").items())]
+        games = list(store.get("games", []))
+    else:
+        with _lock:
+            version, log, games = _games_version, list(_games_log), list(_games_cache)
+    oldest = log[0]["version"] if log else None
+    return version, oldest, [e for e in log if e["version"] > since], games
+
+# ============================================================
+# Client Interest Leases
+# ============================================================
+
+def _interest_leases():
+    """{game_id: {client_id: expires_at}} for unexpired leases; expired ones
+    are dropped on the way."""
+    now = time.time()
+    store = _shared_store()
+    if store is not None:
+        leases = {}
+        for key, expires_at in store.items("interest:").items():
+            if expires_at <= now:
+                store.delete(key)
+                continue
+            _, gid, client_id = key.split(":", 2)
+            leases.setdefault(gid, {})[client_id] = expires_at
+        return leases
+    with _lock:
+        for gid in list(_interest):
+            clients = {c: t for c, t in _interest[gid].items() if t > now}
+            if clients:
+                _interest[gid] = clients
+            else:
+                del _interest[gid]
+        return {gid: dict(clients) for gid, clients in _interest.items()}
+
+def _subscriber_counts():
+    return {gid: len(clients) for gid, clients in _interest_leases().items()}
+
+def _recent_subscriber_counts(refresh=False):
+    """_subscriber_counts() as of the last poll cycle, recomputed at most
+    every INTEREST_POLL_INTERVAL s (or now, with `refresh`), so /plays
+    requests don't each scan the lease table."""
+    global _subscribers_seen
+    taken, counts = _subscribers_seen
+    if refresh or time.time() - taken >= INTEREST_POLL_INTERVAL:
+        counts = _subscriber_counts()
+        _subscribers_seen = (time.time(), counts)
+    return counts
+
 # ============================================================
 # Public API
 # ============================================================
@@ -1191,28 +1944,204 @@ def start_poller():
 def get_live_games(league="all", year=None, week=None, seasontype=2):
     if year is not None and week is not None:
         return _fetch_historical_games(league=league, year=year, week=week, seasontype=seasontype)
-    with _lock:
-        games = list(_games_cache)
+    games = _cached_games()
     if league != "all":
         games = [g for g in games if g["league"] == league]
     return games
 
+def get_games_changes(since, league="all"):
+    """
+    Change feed for the live games list.  Returns {"version", "added",
+    "removed", "changed"} covering everything after version `since`; a
+    client stores "version" and passes it back next time.  If `since` is 0
+    or older than the retained history the full list comes back instead,
+    as {"version", "reset": True, "games"}.
+    """
+    version, oldest, entries, games = _games_feed_since(since)
+    if 0 < since == version:
+        return {"version": version, "added": [], "removed": [], "changed": []}
+    if since <= 0 or since > version or oldest is None or since < oldest:
+        # Unknown or expired version (e.g. from before a restart) — entries
+        # after it may have been dropped, so send the whole list.
+        if league != "all":
+            games = [g for g in games if g["league"] == league]
+        return {"version": version, "reset": True, "games": games}
+
+    # Collapse the entries: what matters is whether each touched game
+    # existed at `since` and whether it exists now.
+    existed_before, leagues = {}, {}
+    for entry in entries:
+        for g in entry["added"]:
+            existed_before.setdefault(g["game_id"], False)
+        for g in entry["changed"] + entry["removed"]:
+            existed_before.setdefault(g["game_id"], True)
+        for g in entry["added"] + entry["changed"] + entry["removed"]:
+            leagues[g["game_id"]] = g["league"]
+    current = {g["game_id"]: g for g in games}
+    added, removed, changed = [], [], []
+    for gid, before in existed_before.items():
+        if league != "all" and leagues[gid] != league:
+            continue
+        if gid in current:
+            (changed if before else added).append(current[gid])
+        elif before:
+            removed.append({"game_id": gid})
+    return {"version": version, "added": added, "removed": removed, "changed": changed}
+
 def get_game_version(game_id):
     """Return the fetched_at timestamp for a cached game without triggering
     a fetch.  Returns 0 if the game is not in cache yet."""
-    with _lock:
-        cached = _plays_cache.get(game_id)
+    cached = _cached_plays(game_id)
     return cached.get("fetched_at", 0) if cached else 0
 
-def get_game_plays(game_id, league="cfb", force_refresh=False):
-    if force_refresh:
+def get_poll_stats():
+    """Counters describing poller work, e.g. how many summary fetches were
+    no-ops because the upstream body had not changed."""
+    store = _shared_store()
+    if store is None:
+        with _lock:
+            stats = dict(_poll_stats)
+    elif POLL_SHARDED:
+        # Sum the counters every shard published; keep each shard's own view
+        per_shard = {key.split(":", 1)[1]: val
+                     for key, val in store.items("poll_stats:").items()}
+        stats = {k: sum(s.get(k, 0) for s in per_shard.values())
+                 for k in ("summary_fetches", "summary_unchanged", "summary_skipped")}
+        stats["shards"] = poll_shards.shard_members(store)
+        stats["per_shard"] = per_shard
+    else:
+        stats = dict(store.get("poll_stats") or _poll_stats)   # the leader's counters
+    fetches = stats["summary_fetches"]
+    stats["unchanged_ratio"] = round(stats["summary_unchanged"] / fetches, 3) if fetches else 0.0
+    return stats
+
+def get_upstream_stats():
+    """Per-endpoint upstream metrics (requests, retries, failures, circuit
+    state) for this process."""
+    return _upstream.stats()
+
+def register_interest(game_id, client_id, lease=INTEREST_LEASE_DEFAULT):
+    """Lease (or renew) a client's interest in a game for `lease` seconds.
+    Subscribed live games are polled at INTEREST_POLL_INTERVAL."""
+    lease = max(1, min(int(lease), INTEREST_LEASE_MAX))
+    expires_at = time.time() + lease
+    store = _shared_store()
+    if store is not None:
+        store.put(f"interest:{game_id}:{client_id}", expires_at)
+    else:
         with _lock:
-            _plays_cache.pop(game_id, None)   # evict this game only; all others stay cached
+            _interest.setdefault(game_id, {})[client_id] = expires_at
+    return {"game_id": game_id, "client_id": client_id, "expires_at": expires_at,
+            "subscribers": len(_interest_leases().get(game_id, {}))}
+
+def release_interest(game_id, client_id):
+    store = _shared_store()
+    if store is not None:
+        store.delete(f"interest:{game_id}:{client_id}")
+    else:
+        with _lock:
+            _interest.get(game_id, {}).pop(client_id, None)
+    return {"game_id": game_id, "client_id": client_id,
+            "subscribers": len(_interest_leases().get(game_id, {}))}
+
+def get_polling_overview():
+    """Per-game polling cadence and subscriber counts for live games (plus
+    any game a client has registered interest in)."""
+    leases = _interest_leases()
+    live = {g["game_id"]: g for g in _cached_games() if g["status"] == "in"}
+    now = time.time()
+    games = []
+    for gid in sorted(set(live) | set(leases)):
+        subs = len(leases.get(gid, {}))
+        cached = _cached_plays(gid)
+        games.append({
+            "game_id":     gid,
+            "league":      live[gid]["league"] if gid in live else None,
+            "live":        gid in live,
+            "subscribers": subs,
+            "cadence":     _game_cadence(subs) if gid in live else None,
+            "data_age":    round(now - cached["fetched_at"], 1) if cached else None,
+        })
+    return {
+        "interest_interval":   INTEREST_POLL_INTERVAL,
+        "background_interval": BACKGROUND_POLL_INTERVAL,
+        "games": games,
+    }
+
+def _freshness_bound(game_id, status):
+    """Seconds a cached result counts as fresh.  The poller re-polls a live
+    game every _game_cadence(); a request-driven refresh inside that window
+    would only duplicate its fetch."""
+    bound = FRESHNESS_BOUNDS.get(status, FRESHNESS_BOUNDS["in"])
+    if status == "in":
+        bound = max(bound, _game_cadence(_recent_subscriber_counts().get(game_id, 0)))
+    return bound
+
+def _refresh_in_background(game_id, league):
+    """Start a background re-fetch of one game, or join the one already in
+    flight.  Returns the Event set when that refresh finishes."""
     with _lock:
-        cached = _plays_cache.get(game_id)
-    if cached:
-        return cached
-    result = _fetch_game_plays_mapped(game_id, league)
+        event = _refreshing.get(game_id)
+        if event is not None:
+            return event
+        event = _refreshing[game_id] = threading.Event()
+
+    def run():
+        try:
+            result = _fetch_game_plays_mapped(game_id, league, skip_unchanged=True)
+            if result is not None:
+                _publish_plays(game_id, result, check=result.get("status") == "in")
+        except Exception as e:
+            print(f"Background refresh error ({game_id}): {e}")
+        finally:
+            with _lock:
+                _refreshing.pop(game_id, None)
+            event.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    return event
+
+def _cold_fetch(game_id, league):
+    """Fetch, map and publish a game nothing is cached for.  Concurrent
+    first requests for the same game share one upstream fetch."""
     with _lock:
-        _plays_cache[game_id] = result        # cache fresh result for subsequent requests
-    return result
+        future = _cold_fetches.get(game_id)
+        owner = future is None
+        if owner:
+            future = _cold_fetches[game_id] = Future()
+    if not owner:
+        return future.result()
+    try:
+        result = _fetch_game_plays_mapped(game_id, league,
+                                          deadline=time.monotonic() + COLD_FETCH_BUDGET)
+        # cache fresh result for subsequent requests
+        _publish_plays(game_id, result, check=result.get("status") == "in")
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _cold_fetches.pop(game_id, None)
+
+def get_game_plays(game_id, league="cfb", force_refresh=False):
+    """
+    Stale-while-revalidate.  A cached result is always returned immediately,
+    annotated with "age" (seconds since upstream last confirmed it) and
+    "stale".  When it is older than its _freshness_bound() — or the
+    caller asked for force_refresh — a background refresh is started (or
+    joined) and "revalidating" is set.  Only a game with nothing cached
+    blocks on an upstream fetch.
+    """
+    cached = _cached_plays(game_id)
+    if not cached:
+        result = _cold_fetch(game_id, league)
+        return dict(result, age=0.0, stale=False, revalidating=False)
+
+    age = _data_age(game_id, cached)
+    stale = age > _freshness_bound(game_id, cached.get("status"))
+    if stale or force_refresh:
+        _refresh_in_background(game_id, cached.get("league", league))
+    return dict(cached, age=round(age, 1), stale=stale,
+                revalidating=stale or force_refresh)
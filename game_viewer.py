@@ -1,11 +1,38 @@
+import time
+_LAUNCHED = time.perf_counter()     # startup probes measure from here
+
 import tkinter as tk
 from tkinter import ttk
 import customtkinter as ctk
+import json
+import os
 import threading
-import requests
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
-SERVER_URL = "https://capp-data-server.onrender.com"
+from ui_dispatch import StartupProbe, UIDispatcher, ui_probe
+# capp_client (and requests under it) is imported on the warm-up thread —
+# nothing in the first window needs it.
+
+# The play table is filled in time slices so a long game never blocks the
+# Tk thread: each slice inserts rows until the budget is spent, then yields.
+PLAY_SLICE_MS = 8
+
+# Play lists are cached by game id and server version (fetched_at): in
+# memory for the session, and on disk for final games, which only change
+# when the server's mapping pipeline does (its PIPELINE_VERSION).
+PLAY_CACHE_DIR    = os.path.join(os.path.expanduser("~"), ".capp_viewer", "plays")
+PLAY_CACHE_MEMORY = 100    # play lists kept in memory, least recently used dropped
+PLAY_CACHE_DISK   = 500    # final games kept on disk, least recently used dropped
+PREFETCH_WORKERS  = 3      # background play-list downloads after a game list loads
+PREFETCH_MAX      = 12     # live games prefetched per list load
+
+# The last game list is shown straight away on the next launch while the
+# fresh one loads.  Each launch appends its startup milestones to the log.
+VIEWER_DIR       = os.path.join(os.path.expanduser("~"), ".capp_viewer")
+GAMES_CACHE_PATH = os.path.join(VIEWER_DIR, "last_games.json")
+STARTUP_LOG_PATH = os.path.join(VIEWER_DIR, "startup.log")
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -21,6 +48,102 @@ GREEN    = "#2ea043"
 ORANGE   = "#d97706"
 RED      = "#cf3130"
 
+# ============================================================
+# Play Cache
+# ============================================================
+
+class PlayCache:
+    """
+    Play lists by game id.  Memory is an LRU of PLAY_CACHE_MEMORY entries;
+    final games are also written to PLAY_CACHE_DIR, an LRU (by file mtime)
+    of PLAY_CACHE_DISK entries, so they survive a restart.  Each entry is
+    the server's /plays response, whose fetched_at is the version
+    /game/{id}/version reports and whose pipeline_version must match the
+    server's for the entry to be used.
+    """
+
+    def __init__(self, directory=PLAY_CACHE_DIR, max_items=PLAY_CACHE_MEMORY,
+                 max_files=PLAY_CACHE_DISK):
+        self.directory = directory
+        self.max_items = max_items
+        self.max_files = max_files
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, game_id):
+        return os.path.join(self.directory, f"{game_id}.json")
+
+    def get(self, game_id, pipeline_version=None):
+        """The cached play list, or None.  An entry mapped by another server
+        pipeline is dropped; while the server's version is unknown (None)
+        only this session's in-memory entries are trusted."""
+        with self._lock:
+            data = self._items.get(game_id)
+            if data is not None:
+                if pipeline_version is None or data.get("pipeline_version") == pipeline_version:
+                    self._items.move_to_end(game_id)
+                    return data
+                del self._items[game_id]
+        if pipeline_version is None:
+            return None
+        path = self._path(game_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("pipeline_version") != pipeline_version:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)      # mark recently used
+        except OSError:
+            pass
+        self._remember(game_id, data)
+        return data
+
+    def put(self, game_id, data):
+        self._remember(game_id, data)
+        if data.get("status") != "post":
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path(game_id) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self._path(game_id))
+            self._trim_disk()
+        except OSError as e:
+            print(f"Play cache write failed for {game_id}: {e}")
+
+    def _trim_disk(self):
+        """Delete the least recently used files beyond max_files."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remember(self, game_id, data):
+        with self._lock:
+            self._items[game_id] = data
+            self._items.move_to_end(game_id)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
 GAME_STATUS_MAP = {
     "pre":  ("Scheduled", MUTED),
     "in":   ("LIVE",      GREEN),
@@ -46,8 +169,28 @@ class GameViewer:
         self.root.geometry("1400x820")
         self.root.configure(bg=BG_DEEP)
         self._selected_game = None
+        self._plays_gen = 0             # bumped on every game switch; stale fills stop
+        self._startup = StartupProbe(_LAUNCHED, STARTUP_LOG_PATH)
+        self._client = None             # created by the warm-up thread; see _get_client
+        self._client_lock = threading.Lock()
+        self._play_cache = PlayCache()
+        self._pipeline_version = None   # the server's, from the warm-up /health ping
+        self._inflight = {}             # game_id -> Future of a download in progress
+        self._inflight_lock = threading.Lock()
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS,
+                                                 thread_name_prefix="prefetch")
+        self._prefetch_gen = 0          # bumped on every game list load
+        self._ui = UIDispatcher(root)   # worker threads post UI updates here
+        # Wake the server and open the connection while the window builds
+        threading.Thread(target=self._warm_up, daemon=True).start()
         self._build_ui()
+        self._startup.mark("window_built")
+        self.root.after_idle(self._startup.mark, "first_paint")
+        cached = self._load_cached_games()      # restores the last filters too
         self._load_games()
+        if cached:
+            self._populate_games(cached.get("games", []), saved_at=cached.get("saved_at", 0))
+            self._startup.mark("cached_list")
 
     # ─────────────────────────────────────────────────────────────
     # UI Construction
@@ -235,6 +378,53 @@ class GameViewer:
         self.play_tree.tag_configure("q4",   foreground="#ffb060")
         self.play_tree.tag_configure("ot",   foreground=RED)
 
+    # ─────────────────────────────────────────────────────────────
+    # Startup
+    # ─────────────────────────────────────────────────────────────
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                from capp_client import CappClient
+                self._client = CappClient()
+            return self._client
+
+    def _warm_up(self):
+        """Import the HTTP stack and ping /health so a sleeping server starts
+        waking — and the pooled connection is open — before the game list
+        request needs it."""
+        try:
+            health = self._get_client().health()
+            self._pipeline_version = health.get("pipeline_version")
+            self._startup.mark("server_awake")
+        except Exception as e:
+            print(f"Warm-up ping failed: {e}")
+
+    def _load_cached_games(self):
+        """The last session's game list, so the window has data before the
+        server answers.  Its filters are restored so the refresh that
+        follows loads the same list.  None if there is no usable cache."""
+        try:
+            with open(GAMES_CACHE_PATH, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        filters = cached.get("filters", {})
+        for var, key in ((self.league_var, "league"), (self.year_var, "year"),
+                         (self.week_var, "week"), (self.stype_var, "stype")):
+            if key in filters:
+                var.set(filters[key])
+        return cached
+
+    def _save_games(self, filters, games):
+        try:
+            os.makedirs(VIEWER_DIR, exist_ok=True)
+            tmp = GAMES_CACHE_PATH + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"filters": filters, "saved_at": time.time(), "games": games}, f)
+            os.replace(tmp, GAMES_CACHE_PATH)
+        except OSError as e:
+            print(f"Game list cache write failed: {e}")
+
     # ─────────────────────────────────────────────────────────────
     # Data Loading
     # ─────────────────────────────────────────────────────────────
@@ -245,10 +435,12 @@ class GameViewer:
 
     def _fetch_games(self):
         try:
-            league = self.league_var.get().lower()
-            year_str = self.year_var.get()
-            week_str = self.week_var.get()
-            stype = 3 if self.stype_var.get() == "Postseason" else 2
+            filters = {"league": self.league_var.get(), "year": self.year_var.get(),
+                       "week": self.week_var.get(), "stype": self.stype_var.get()}
+            league = filters["league"].lower()
+            year_str = filters["year"]
+            week_str = filters["week"]
+            stype = 3 if filters["stype"] == "Postseason" else 2
 
             params = {"league": league}
             if year_str:
@@ -258,17 +450,19 @@ class GameViewer:
             if stype == 3:
                 params["seasontype"] = 3
 
-            r = requests.get(f"{SERVER_URL}/games", params=params, timeout=15)
-            r.raise_for_status()
-            games = r.json()
-            self.root.after(0, self._populate_games, games)
+            games = self._get_client().games(**params)
+            self._ui.post(self._populate_games, games)
+            self._save_games(filters, games)
         except Exception as e:
-            self.root.after(0, lambda: self.status_label.configure(
-                text=f"Error: {e}", text_color=RED))
-            self.root.after(0, lambda: self.load_btn.configure(
+            self._ui.post(lambda err=e: self.status_label.configure(
+                text=f"Error: {err}", text_color=RED))
+            self._ui.post(lambda: self.load_btn.configure(
                 state="normal", text="Load Games"))
+            self._startup.finish()
 
-    def _populate_games(self, games):
+    def _populate_games(self, games, saved_at=None):
+        """Fill the game list.  With `saved_at`, `games` is the cached list
+        from a previous launch, shown while the fresh one loads."""
         self.game_tree.delete(*self.game_tree.get_children())
         self._game_data = {}
 
@@ -294,9 +488,38 @@ class GameViewer:
 
         total = len(games)
         self.game_count_label.configure(text=f"{total} game{'s' if total != 1 else ''}")
+        if saved_at is not None:
+            then = datetime.fromtimestamp(saved_at).strftime("%b %d %I:%M %p")
+            self.status_label.configure(text=f"Showing list from {then} — refreshing...",
+                                        text_color=MUTED)
+            return
         now = datetime.now().strftime("%I:%M:%S %p")
         self.status_label.configure(text=f"Last updated: {now}", text_color=MUTED)
         self.load_btn.configure(state="normal", text="Load Games")
+        self._startup.mark("data")
+        self._startup.finish()
+        self._prefetch_plays(games)
+
+    def _prefetch_plays(self, games):
+        """Download play lists for up to PREFETCH_MAX of the listed live
+        games in the background so selecting one is instant.  Final games
+        are left alone: for a past week each would be a cold fetch on the
+        server, spending the ESPN rate limit its live poller needs.
+        Loading another list abandons the rest."""
+        self._prefetch_gen += 1
+        gen = self._prefetch_gen
+
+        def prefetch(game):
+            if gen != self._prefetch_gen:
+                return
+            try:
+                self._get_plays(game, revalidate=False)
+            except Exception:
+                pass    # selecting the game retries and shows the error
+
+        live = [g for g in games if g.get("status") == "in"]
+        for g in live[:PREFETCH_MAX]:
+            self._prefetch_pool.submit(prefetch, g)
 
     def _on_game_select(self, event):
         sel = self.game_tree.selection()
@@ -309,30 +532,61 @@ class GameViewer:
         self._load_plays(game)
 
     def _load_plays(self, game):
-        game_id = game.get("game_id")
-        league  = game.get("league", "cfb")
         home = game.get("home_team", game.get("home", ""))
         away = game.get("away_team", game.get("away", ""))
         self.score_label.configure(
             text=f"Loading plays for  {away}  vs  {home}...", text_color=MUTED)
+        self._plays_gen += 1
         self.play_tree.delete(*self.play_tree.get_children())
         self.play_count_label.configure(text="")
         threading.Thread(target=self._fetch_plays,
-                         args=(game_id, league), daemon=True).start()
+                         args=(game, self._plays_gen), daemon=True).start()
+
+    def _get_plays(self, game, revalidate=True):
+        """A game's /plays response.  Final games come straight from the
+        cache, as does a cached live game when `revalidate` is off; otherwise
+        the request is conditional, so an unchanged game costs a 304.
+        Concurrent requests for the same game share one download."""
+        game_id = game.get("game_id")
+        data = self._play_cache.get(game_id, self._pipeline_version)
+        if data is not None and (data.get("status") == "post" or not revalidate):
+            return data
+
+        with self._inflight_lock:
+            future = self._inflight.get(game_id)
+            owner = future is None
+            if owner:
+                future = self._inflight[game_id] = Future()
+        if not owner:
+            return future.result()
+        try:
+            data = self._get_client().plays(game_id, game.get("league", "cfb"))
+            self._play_cache.put(game_id, data)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(game_id, None)
 
-    def _fetch_plays(self, game_id, league):
+    def _fetch_plays(self, game, gen):
         try:
-            r = requests.get(f"{SERVER_URL}/game/{game_id}/plays",
-                             params={"league": league}, timeout=20)
-            r.raise_for_status()
-            data = r.json()
-            self.root.after(0, self._populate_plays, data)
+            data = self._get_plays(game)
+            # Row values and tags are built here, off the Tk thread
+            rows = _play_rows(data.get("entries", []))
+            self._ui.post_latest("plays", self._populate_plays, data, rows, gen)
         except Exception as e:
-            self.root.after(0, lambda: self.score_label.configure(
-                text=f"Error loading plays: {e}", text_color=RED))
+            self._ui.post_latest("plays", self._show_plays_error, e, gen)
+
+    def _show_plays_error(self, err, gen):
+        if gen == self._plays_gen:
+            self.score_label.configure(text=f"Error loading plays: {err}", text_color=RED)
 
-    def _populate_plays(self, data):
-        entries     = data.get("entries", [])
+    def _populate_plays(self, data, rows, gen):
+        if gen != self._plays_gen:
+            return      # another game was selected while this one downloaded
         actual_home = data.get("actual_home", 0)
         actual_away = data.get("actual_away", 0)
         home_name   = data.get("home_name", "Home")
@@ -345,44 +599,68 @@ class GameViewer:
             text_color=GREEN if status == "in" else WHITE)
 
         self.play_tree.delete(*self.play_tree.get_children())
+        self._insert_play_slice(rows, 0, gen, time.perf_counter())
 
-        for i, e in enumerate(entries):
-            down = str(e.get("down", ""))
-            qtr  = str(e.get("quarter", ""))
-            row_tag = "odd" if i % 2 else "even"
-
-            if down in ("KO",):
-                type_tag = "ko"
-            elif down in ("EP", "2PT"):
-                type_tag = "ep"
-            elif qtr == "OT":
-                type_tag = "ot"
-            elif qtr == "4":
-                type_tag = "q4"
-            elif qtr == "3":
-                type_tag = "q3"
-            else:
-                type_tag = row_tag
-
-            self.play_tree.insert("", "end", tags=(row_tag, type_tag), values=(
-                i + 1,
-                e.get("home_score", ""),
-                e.get("away_score", ""),
-                e.get("clock", ""),
-                qtr,
-                down,
-                e.get("distance", ""),
-                e.get("gain", ""),
-                e.get("field_position", ""),
-                e.get("possession", ""),
-                e.get("run_clock", ""),
-                e.get("home_time_out", ""),
-                e.get("away_time_out", ""),
-                e.get("play_text", ""),
-            ))
-
-        self.play_count_label.configure(
-            text=f"{len(entries)} plays loaded")
+    def _insert_play_slice(self, rows, start, gen, started):
+        """Insert rows from `start` until PLAY_SLICE_MS is spent, then
+        reschedule.  A newer game selection bumps _plays_gen and the
+        remaining slices of this fill are dropped."""
+        if gen != self._plays_gen:
+            return
+        deadline = time.perf_counter() + PLAY_SLICE_MS / 1000
+        i, n = start, len(rows)
+        while i < n:
+            tags, values = rows[i]
+            self.play_tree.insert("", "end", tags=tags, values=values)
+            i += 1
+            if i % 25 == 0 and time.perf_counter() >= deadline:
+                break
+        if i < n:
+            self.play_count_label.configure(text=f"Loading plays... {i}/{n}")
+            self.root.after(1, self._insert_play_slice, rows, i, gen, started)
+            return
+        self.play_count_label.configure(text=f"{n} plays loaded")
+        ui_probe("play table", started, f"{n} rows")
+
+
+def _play_rows(entries):
+    """(tags, values) for every play-table row."""
+    rows = []
+    for i, e in enumerate(entries):
+        down = str(e.get("down", ""))
+        qtr  = str(e.get("quarter", ""))
+        row_tag = "odd" if i % 2 else "even"
+
+        if down in ("KO",):
+            type_tag = "ko"
+        elif down in ("EP", "2PT"):
+            type_tag = "ep"
+        elif qtr == "OT":
+            type_tag = "ot"
+        elif qtr == "4":
+            type_tag = "q4"
+        elif qtr == "3":
+            type_tag = "q3"
+        else:
+            type_tag = row_tag
+
+        rows.append(((row_tag, type_tag), (
+            i + 1,
+            e.get("home_score", ""),
+            e.get("away_score", ""),
+            e.get("clock", ""),
+            qtr,
+            down,
+            e.get("distance", ""),
+            e.get("gain", ""),
+            e.get("field_position", ""),
+            e.get("possession", ""),
+            e.get("run_clock", ""),
+            e.get("home_time_out", ""),
+            e.get("away_time_out", ""),
+            e.get("play_text", ""),
+        )))
+    return rows
 
 
 if __name__ == "__main__":
@@ -1,10 +1,23 @@
-from fastapi import FastAPI, Query, Header, HTTPException, Depends
-from typing import Optional
+from fastapi import FastAPI, Query, Header, HTTPException, Depends, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional
+import json
 import os
-from espn_fetcher import get_live_games, get_game_plays, get_game_version, start_poller
+import time
+from upstream import UpstreamError
+from qc_engine import get_alerts
+from qc_jobs import submit_job, get_job, get_results, cancel_job
+from espn_fetcher import (get_live_games, get_game_plays, get_game_version,
+                          get_poll_stats, start_poller, map_archived_response,
+                          start_remap, get_remap_status, register_interest,
+                          release_interest, get_polling_overview,
+                          get_upstream_stats, get_games_changes, PIPELINE_VERSION)
 
 
 app = FastAPI(title="CAPP Data Server")
+# Play lists are mostly repeated keys and text — they shrink ~10x
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # --- API Key Auth ---
 def _valid_keys() -> set:
@@ -15,13 +28,19 @@ def verify_api_key(x_api_key: str = Header(..., description="CAPP API key")):
     if x_api_key not in _valid_keys():
         raise HTTPException(status_code=401, detail="Invalid or missing API key")
 
+@app.exception_handler(UpstreamError)
+def upstream_unavailable(request: Request, exc: UpstreamError):
+    # Circuit open / local rate limit exhausted — tell clients to back off
+    return JSONResponse(status_code=503, content={"detail": f"ESPN unavailable: {exc}"},
+                        headers={"Retry-After": "30"})
+
 @app.on_event("startup")
 def startup():
     start_poller()
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {"status": "ok", "pipeline_version": PIPELINE_VERSION}
 
 @app.get("/games", dependencies=[Depends(verify_api_key)])
 def games(
@@ -29,16 +48,27 @@ def games(
     year: Optional[int] = Query(None, description="Season year e.g. 2025"),
     week: Optional[int] = Query(None, description="Week number"),
     seasontype: int = Query(2, description="2=regular, 3=postseason"),
+    since: Optional[int] = Query(None, description="Change-feed version from a previous call — "
+                                                   "returns only added/removed/changed games"),
 ):
+    if since is not None and (year is None or week is None):
+        return get_games_changes(since, league=league)
     return get_live_games(league=league, year=year, week=week, seasontype=seasontype)
 
 @app.get("/game/{game_id}/plays", dependencies=[Depends(verify_api_key)])
 def plays(
+    request: Request,
     game_id: str,
     league: str = Query("cfb", description="cfb or nfl"),
-    force_refresh: bool = Query(False, description="Bypass cache and re-fetch from API"),
+    force_refresh: bool = Query(False, description="Revalidate against ESPN in the background; cached data is still returned"),
 ):
-    return get_game_plays(game_id, league=league, force_refresh=force_refresh)
+    """Carries an ETag for the cached version (fetched_at + pipeline);
+    a matching If-None-Match gets 304 instead of the play list."""
+    result = get_game_plays(game_id, league=league, force_refresh=force_refresh)
+    etag = f'W/"{game_id}-{result.get("fetched_at", 0)}-{result.get("pipeline_version", "")}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(result, headers={"ETag": etag})
 
 @app.get("/game/{game_id}/version", dependencies=[Depends(verify_api_key)])
 def game_version(game_id: str):
@@ -46,3 +76,128 @@ def game_version(game_id: str):
     cached entry.  Clients poll this every 60 s to detect retroactive data
     corrections without re-downloading the full play list each time."""
     return {"game_id": game_id, "fetched_at": get_game_version(game_id)}
+
+@app.post("/game/{game_id}/interest", dependencies=[Depends(verify_api_key)])
+def interest(
+    game_id: str,
+    client_id: str = Query(..., description="Stable id of the subscribing client"),
+    lease: int = Query(60, description="Lease length in seconds — renew before it expires"),
+):
+    """Register or renew interest in a game.  Subscribed live games are
+    polled at the fast cadence until every lease expires."""
+    return register_interest(game_id, client_id, lease)
+
+@app.delete("/game/{game_id}/interest", dependencies=[Depends(verify_api_key)])
+def drop_interest(game_id: str, client_id: str = Query(...)):
+    return release_interest(game_id, client_id)
+
+@app.get("/alerts", dependencies=[Depends(verify_api_key)])
+def alerts(
+    since: Optional[int] = Query(None, description="last_id from a previous call — returns only newer alerts"),
+    game_id: Optional[List[str]] = Query(None, description="Restrict to these games"),
+    limit: int = Query(500, ge=1, le=5000),
+):
+    """Deduplicated QC alerts raised by the server-side QC engine as games
+    are re-mapped.  Without `since`, the newest `limit` alerts."""
+    return get_alerts(since=since, game_ids=game_id, limit=limit)
+
+@app.post("/qc/jobs", dependencies=[Depends(verify_api_key)])
+def qc_submit(
+    league: str = Query("cfb", description="all, cfb, or nfl"),
+    year: int = Query(..., description="Season year e.g. 2025"),
+    week: Optional[int] = Query(None, description="Week number — omit for the whole season"),
+    seasontype: int = Query(2, description="2=regular, 3=postseason"),
+    refresh: bool = Query(False, description="Start a new run even if a cached result exists"),
+):
+    """Start a historical QC job (or return the running / cached one for the
+    same parameters).  Poll GET /qc/jobs/{job_id} or stream /events."""
+    return submit_job(league, year, week=week, seasontype=seasontype, refresh=refresh)
+
+def _qc_job_or_404(job_id, include_games=False):
+    job = get_job(job_id, include_games=include_games)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown QC job")
+    return job
+
+@app.get("/qc/jobs/{job_id}", dependencies=[Depends(verify_api_key)])
+def qc_status(job_id: str):
+    """Progress (checked / total) and, once done, the summary counts."""
+    return _qc_job_or_404(job_id)
+
+@app.get("/qc/jobs/{job_id}/results", dependencies=[Depends(verify_api_key)])
+def qc_results(
+    job_id: str,
+    game_id: Optional[List[str]] = Query(None, description="Only these games' reports"),
+    versions_only: bool = Query(False, description="Return {game_id: version} instead of reports"),
+):
+    """Summary plus every game's issue list.  409 until the job is done."""
+    job = _qc_job_or_404(job_id)
+    if job["state"] != "done":
+        raise HTTPException(status_code=409, detail=f"QC job is {job['state']}")
+    return get_results(job_id, game_ids=game_id, versions_only=versions_only)
+
+@app.get("/qc/jobs/{job_id}/events", dependencies=[Depends(verify_api_key)])
+def qc_events(job_id: str):
+    """Server-sent events: one status message per progress change until the
+    job finishes."""
+    _qc_job_or_404(job_id)
+
+    def stream():
+        last = None
+        while True:
+            job = get_job(job_id)
+            state = (job["state"], job.get("checked")) if job else None
+            if state != last:
+                last = state
+                yield f"data: {json.dumps(job)}\n\n"
+            if job is None or job["state"] not in ("queued", "running"):
+                return
+            time.sleep(0.5)
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+@app.delete("/qc/jobs/{job_id}", dependencies=[Depends(verify_api_key)])
+def qc_cancel(job_id: str):
+    _qc_job_or_404(job_id)
+    return cancel_job(job_id)
+
+@app.get("/admin/poll-stats", dependencies=[Depends(verify_api_key)])
+def poll_stats():
+    """Poller counters — e.g. how many live summary fetches were no-ops
+    because ESPN returned unchanged data (no re-map needed)."""
+    return get_poll_stats()
+
+@app.post("/admin/remap", dependencies=[Depends(verify_api_key)])
+def remap(
+    game_id: Optional[List[str]] = Query(None, description="Rebuild these games, cached or not"),
+    force: bool = Query(False, description="Also rebuild cached games already on the current pipeline"),
+):
+    """Rebuild cached results from the raw response archive (no ESPN traffic)
+    after a pipeline change.  Runs in the background; poll GET for status."""
+    start_remap(game_ids=game_id, force=force)
+    return get_remap_status()
+
+@app.get("/admin/remap", dependencies=[Depends(verify_api_key)])
+def remap_status():
+    return get_remap_status()
+
+@app.get("/admin/archive/{game_id}/plays", dependencies=[Depends(verify_api_key)])
+def archived_plays(
+    game_id: str,
+    at: Optional[float] = Query(None, description="Unix time — replay the newest snapshot at or before this"),
+):
+    """Reproduce what a game looked like at a given poll by re-mapping the
+    archived raw response with the current pipeline."""
+    result = map_archived_response(game_id, at=at)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No archived response for this game")
+    return result
+
+@app.get("/admin/upstream", dependencies=[Depends(verify_api_key)])
+def upstream_stats():
+    """ESPN request governor metrics for the worker that serves this call."""
+    return get_upstream_stats()
+
+@app.get("/admin/polling", dependencies=[Depends(verify_api_key)])
+def polling():
+    """Per-game poll cadence and interest subscriber counts."""
+    return get_polling_overview()
@@ -0,0 +1,82 @@
+"""
+CAPP Data Server - Sharded Live Polling
+Splits live-game polling across several poller workers (uvicorn workers,
+or standalone poller_worker.py processes) that share one store.
+
+Each worker heartbeats into the store; the live members form a consistent-
+hash ring and each worker polls only the game ids it owns.  When a worker
+joins or its heartbeat lapses the ring is rebuilt and only the games on
+the affected arcs move.  Whichever worker holds the leader lock also
+fetches the scoreboards and publishes the games list for the others.
+"""
+
+import bisect
+import hashlib
+import os
+import socket
+import time
+
+_MEMBER_PREFIX = "shard:"
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes per member."""
+
+    def __init__(self, members, vnodes=64):
+        self.members = sorted(members)
+        self._points = sorted(
+            (_hash(f"{m}#{i}"), m) for m in self.members for i in range(vnodes))
+        self._keys = [p[0] for p in self._points]
+
+    def owner(self, key):
+        if not self._points:
+            return None
+        idx = bisect.bisect(self._keys, _hash(str(key))) % len(self._points)
+        return self._points[idx][1]
+
+
+class Shard:
+    """One poller worker's membership in the ring."""
+
+    def __init__(self, store, leader_lock, worker_id=None, ttl=90):
+        self.store = store
+        self.leader_lock = leader_lock
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.ttl = ttl
+        self.ring = HashRing([self.worker_id])
+        self.owned = 0
+
+    def heartbeat(self):
+        """Refresh this worker's membership and rebuild the ring from every
+        member seen within the TTL.  Returns True when membership changed."""
+        now = time.time()
+        self.store.put(_MEMBER_PREFIX + self.worker_id,
+                       {"pid": os.getpid(), "seen": now, "owned": self.owned,
+                        "leader": self.is_leader()})
+        members = [key[len(_MEMBER_PREFIX):]
+                   for key, info in self.store.items(_MEMBER_PREFIX).items()
+                   if now - info.get("seen", 0) <= self.ttl]
+        if sorted(members) == self.ring.members:
+            return False
+        self.ring = HashRing(members)
+        print(f"Shard {self.worker_id}: ring rebalanced -> {self.ring.members}")
+        return True
+
+    def owns(self, game_id):
+        return self.ring.owner(game_id) == self.worker_id
+
+    def is_leader(self):
+        return self.leader_lock.try_acquire()
+
+    def leave(self):
+        self.store.delete(_MEMBER_PREFIX + self.worker_id)
+
+
+def shard_members(store):
+    """{worker_id: heartbeat info} for every registered shard."""
+    return {key[len(_MEMBER_PREFIX):]: info
+            for key, info in store.items(_MEMBER_PREFIX).items()}
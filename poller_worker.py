@@ -0,0 +1,28 @@
+"""
+CAPP Data Server - Standalone Poller Worker
+Runs one shard of the live poller without serving HTTP, so polling can be
+spread over more processes than there are uvicorn workers.
+
+    CAPP_SHARED_CACHE=/var/capp/cache.db python poller_worker.py --id poller-2
+"""
+
+import argparse
+
+import espn_fetcher
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run one sharded CAPP poller worker")
+    ap.add_argument("--store", default=espn_fetcher.SHARED_CACHE_PATH,
+                    help="Shared SQLite cache path (default: $CAPP_SHARED_CACHE)")
+    ap.add_argument("--id", default=None, help="Worker id (default: <hostname>-<pid>)")
+    args = ap.parse_args()
+    if not args.store:
+        ap.error("a shared store is required (--store or CAPP_SHARED_CACHE)")
+    espn_fetcher.SHARED_CACHE_PATH = args.store
+    espn_fetcher.POLL_SHARDED = True
+    espn_fetcher.run_shard(args.id)
+
+
+if __name__ == "__main__":
+    main()
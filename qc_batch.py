@@ -0,0 +1,253 @@
+"""
+CAPP Data Server - Batch QC
+Season-sized QC over packed arrays.  BatchPacker copies each game's play
+entries once into typed columns (scores, clock / quarter codes, down codes,
+field-position and server-flag masks) with per-game offsets; check_batch()
+and flag_batch() then evaluate every rule with NumPy operations across all
+games at once.
+
+Output is identical to the per-row checkers: check_batch() returns, per
+game, the same issue list (same order, same messages) as
+AnomalyChecker.check, and flag_batch() the same {play_index: text} dict as
+espn_fetcher._qc_flag_entries.  Clock and quarter are compared as codes
+for their original values, so equality matches the dict-based checks
+exactly.
+"""
+
+import numpy as np
+
+import espn_fetcher
+from qc_rules import AnomalyChecker, classify_issue
+
+# Down codes
+_OTHER, _KO, _EP, _2PT, _SCRIMMAGE = 0, 1, 2, 3, 4
+_DOWN_CODES = {"KO": _KO, "EP": _EP, "2PT": _2PT,
+               "1": _SCRIMMAGE, "2": _SCRIMMAGE, "3": _SCRIMMAGE, "4": _SCRIMMAGE}
+
+
+class PackedEntries:
+    """Column arrays for many games' entries; game g owns rows
+    offsets[g]:offsets[g + 1]."""
+
+    def __init__(self, offsets, home, away, clock, quarter, down, fp_zero, qc_clean,
+                 clock_values, quarter_values, home_names, away_names, game_ids):
+        self.offsets = offsets
+        self.home, self.away = home, away
+        self.clock, self.quarter, self.down = clock, quarter, down
+        self.fp_zero, self.qc_clean = fp_zero, qc_clean
+        self.clock_values, self.quarter_values = clock_values, quarter_values
+        self.home_names, self.away_names = home_names, away_names
+        self.game_ids = game_ids
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class BatchPacker:
+    """Accumulates games one at a time (so callers can drop each game's
+    entry dicts as soon as it is packed), then builds PackedEntries."""
+
+    def __init__(self):
+        self._lengths = []
+        self._home, self._away = [], []
+        self._clock, self._quarter, self._down = [], [], []
+        self._fp_zero, self._qc_clean = [], []
+        self._clock_codes, self._quarter_codes = {}, {}
+        self._home_names, self._away_names, self._game_ids = [], [], []
+
+    def add(self, entries, home_name="Home", away_name="Away", game_id=None):
+        # One comprehension per column — cheaper than per-row appends
+        clocks, quarters = self._clock_codes, self._quarter_codes
+        self._home += [e.get("home_score", 0) for e in entries]
+        self._away += [e.get("away_score", 0) for e in entries]
+        self._clock += [clocks.setdefault(e.get("clock"), len(clocks)) for e in entries]
+        self._quarter += [quarters.setdefault(e.get("quarter"), len(quarters)) for e in entries]
+        self._down += [_DOWN_CODES.get(str(e.get("down", "")), _OTHER) for e in entries]
+        self._fp_zero += [e.get("field_position") == 0 for e in entries]
+        self._qc_clean += [e.get("qc_issue", "") == "" for e in entries]
+        self._lengths.append(len(entries))
+        self._home_names.append(home_name)
+        self._away_names.append(away_name)
+        self._game_ids.append(game_id)
+
+    def finish(self):
+        offsets = np.zeros(len(self._lengths) + 1, dtype=np.int64)
+        np.cumsum(self._lengths, out=offsets[1:])
+        return PackedEntries(
+            offsets,
+            np.asarray(self._home, dtype=np.int64), np.asarray(self._away, dtype=np.int64),
+            np.asarray(self._clock, dtype=np.int64), np.asarray(self._quarter, dtype=np.int64),
+            np.asarray(self._down, dtype=np.int8),
+            np.asarray(self._fp_zero, dtype=bool), np.asarray(self._qc_clean, dtype=bool),
+            list(self._clock_codes), list(self._quarter_codes),
+            list(self._home_names), list(self._away_names), list(self._game_ids))
+
+
+def pack(games):
+    """Pack an iterable of (entries, home_name, away_name) tuples."""
+    packer = BatchPacker()
+    for entries, home_name, away_name in games:
+        packer.add(entries, home_name, away_name)
+    return packer.finish()
+
+
+# ============================================================
+# Shared Columns
+# ============================================================
+
+class _Frame:
+    """Per-row helpers derived once from a PackedEntries."""
+
+    def __init__(self, p):
+        n = len(p.home)
+        lengths = np.diff(p.offsets)
+        self.n = n
+        self.game = np.repeat(np.arange(len(p), dtype=np.int64), lengths)
+        self.local = np.arange(n, dtype=np.int64) - p.offsets[:-1][self.game]
+        self.has_prev = self.local > 0                       # row i-1 is in the same game
+        self.has_next = np.zeros(n, dtype=bool)
+        if n:
+            self.has_next[:-1] = self.game[1:] == self.game[:-1]
+        self.dh = np.zeros(n, dtype=np.int64)
+        self.da = np.zeros(n, dtype=np.int64)
+        self.dh[1:] = p.home[1:] - p.home[:-1]
+        self.da[1:] = p.away[1:] - p.away[:-1]
+        self.dh[~self.has_prev] = 0
+        self.da[~self.has_prev] = 0
+        self.next_down = np.full(n, -1, dtype=np.int8)      # -1: no next row
+        if n:
+            self.next_down[:-1] = p.down[1:]
+        self.next_down[~self.has_next] = -1
+
+    def streak(self, p):
+        """Clock-stuck streak length ending at each row (1 = not stuck)."""
+        same = np.zeros(self.n, dtype=bool)
+        same[1:] = (p.clock[1:] == p.clock[:-1]) & (p.quarter[1:] == p.quarter[:-1])
+        same &= self.has_prev & ~np.isin(p.down, (_KO, _EP, _2PT))
+        idx = np.arange(self.n, dtype=np.int64)
+        return idx - np.maximum.accumulate(np.where(same, 0, idx)) + 1
+
+    def missing_ep(self, p):
+        """Rows with a +6 delta and no EP/2PT on it or the next row."""
+        return (((self.dh == 6) | (self.da == 6))
+                & ~np.isin(p.down, (_EP, _2PT)) & ~np.isin(self.next_down, (_EP, _2PT)))
+
+
+# ============================================================
+# AnomalyChecker parity
+# ============================================================
+
+_STUCK, _SCORE, _MISSING_EP, _FP = range(4)     # rule order inside one game
+
+
+def check_batch(p, checker=AnomalyChecker):
+    """AnomalyChecker.check for every packed game.  Returns a list (one per
+    game) of issue lists."""
+    f = _Frame(p)
+    rows = []   # (game, rule, local index, sub-order, issue)
+
+    for i in np.flatnonzero(f.streak(p) == checker.STUCK_THRESHOLD):
+        rows.append((f.game[i], _STUCK, f.local[i], 0, {
+            "severity": "WARNING", "type": "stuck_clock",
+            "message": f"Clock stuck at {p.clock_values[p.clock[i]]} for "
+                       f"{checker.STUCK_THRESHOLD}+ plays in Q{p.quarter_values[p.quarter[i]]}",
+            "play_index": int(f.local[i])}))
+
+    # Every valid increment is >= 0, so this also catches the bundled artifacts
+    valid = np.asarray(sorted(checker.VALID_INCREMENTS))
+    for sub, (delta, names) in enumerate(((f.dh, p.home_names), (f.da, p.away_names))):
+        for i in np.flatnonzero((delta != 0) & ~np.isin(delta, valid)):
+            g, li, d = f.game[i], int(f.local[i]), int(delta[i])
+            team = names[g]
+            if d in checker.BUNDLED_LAG_ARTIFACTS:
+                issue = {"severity": "INFO", "type": "bundled_score_artifact",
+                         "message": f"{team} bundled-score lag artifact ({d:+d}) at play #{li + 1}"}
+            elif d < 0:
+                issue = {"severity": "ERROR", "type": "score_regression",
+                         "message": f"{team} score decreased by {abs(d)} at play #{li + 1}"}
+            else:
+                issue = {"severity": "WARNING", "type": "invalid_score_jump",
+                         "message": f"{team} score jumped by {d} at play #{li + 1} (unexpected value)"}
+            issue["play_index"] = li
+            rows.append((g, _SCORE, li, sub, issue))
+
+    for i in np.flatnonzero(f.missing_ep(p)):
+        g, li = f.game[i], int(f.local[i])
+        scorer = p.home_names[g] if f.dh[i] == 6 else p.away_names[g]
+        flag_idx = li - 1 if p.down[i] == _KO else li
+        rows.append((g, _MISSING_EP, li, 0, {
+            "severity": "WARNING", "type": "missing_ep",
+            "message": f"TD by {scorer} at play #{flag_idx + 1} — no EP or 2PT row follows",
+            "play_index": flag_idx}))
+
+    scrimmage_zero = np.bincount(f.game[p.fp_zero & (p.down == _SCRIMMAGE)], minlength=len(p))
+    for g in np.flatnonzero(scrimmage_zero > 3):
+        rows.append((g, _FP, 0, 0, {
+            "severity": "INFO", "type": "missing_fp",
+            "message": f"{int(scrimmage_zero[g])} scrimmage plays have field_position=0 (missing data)",
+            "play_index": 0}))
+
+    rows.sort(key=lambda r: r[:4])
+    issues = [[] for _ in range(len(p))]
+    for g, _, _, _, issue in rows:
+        issues[g].append(issue)
+    return issues
+
+
+def classify_batch(p, issues, note):
+    """classify_issue() for check_batch output, using the packed server
+    qc_issue flags.  Returns per-game lists of (issue, severity, message,
+    auto_fixed)."""
+    out = []
+    for g, game_issues in enumerate(issues):
+        start, end = int(p.offsets[g]), int(p.offsets[g + 1])
+        # classify_issue only looks at qc_issue of the flagged row
+        rows = [{"qc_issue": "" if clean else "x"} for clean in p.qc_clean[start:end]]
+        out.append([(issue, *classify_issue(issue, rows, note)) for issue in game_issues])
+    return out
+
+
+# ============================================================
+# _qc_flag_entries parity
+# ============================================================
+
+def flag_batch(p):
+    """espn_fetcher._qc_flag_entries for every packed game.  Returns a list
+    (one per game) of {play_index: text} dicts."""
+    f = _Frame(p)
+    rows = []   # (game, rule, local index, sub-order, flag index, message)
+
+    valid = np.asarray(sorted(espn_fetcher._QC_VALID_POS))
+    bundled = np.asarray(sorted(espn_fetcher._QC_BUNDLED_ART))
+    for sub, delta in enumerate((f.dh, f.da)):
+        hit = (delta != 0) & ~np.isin(delta, bundled) & ((delta < 0) | ~np.isin(delta, valid))
+        for i in np.flatnonzero(hit):
+            d, li = int(delta[i]), int(f.local[i])
+            msg = f"Score dropped {d}" if d < 0 else f"Score jumped +{d}"
+            rows.append((f.game[i], 0, li, sub, li, msg))
+
+    thresh = espn_fetcher._QC_STUCK_THRESH
+    for i in np.flatnonzero(f.streak(p) == thresh):
+        li = int(f.local[i])
+        rows.append((f.game[i], 1, li, 0, li, f"Clock stuck ({thresh}+ plays)"))
+
+    ep = f.missing_ep(p)
+    for i in np.flatnonzero(ep):
+        li = int(f.local[i])
+        if p.down[i] == _KO:
+            flag_idx = li - 1
+        elif p.down[i - 1] == _KO and li >= 2:
+            # +6 right after a KO that opened a new period — filtered
+            # end-of-period plays, not a detectable missing EP
+            if p.quarter[i - 1] != p.quarter[i - 2]:
+                continue
+            flag_idx = li
+        else:
+            flag_idx = li
+        rows.append((f.game[i], 2, li, 0, flag_idx, "Missing EP after TD"))
+
+    rows.sort(key=lambda r: r[:4])
+    flags = [{} for _ in range(len(p))]
+    for g, _, _, _, flag_idx, msg in rows:
+        flags[g].setdefault(flag_idx, []).append(msg)
+    return [{idx: " · ".join(msgs) for idx, msgs in game.items()} for game in flags]
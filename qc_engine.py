@@ -0,0 +1,189 @@
+"""
+CAPP Data Server - QC Engine
+Runs the shared QC rule set (qc_rules.AnomalyChecker) on a game each time
+the poller re-maps it, and keeps the resulting alerts — deduplicated — in a
+SQLite file.  Checks are incremental: only rows that are new or were
+corrected since the game's previous check are examined.  QC clients read
+only new alerts from /alerts?since=<id> instead of downloading and
+re-checking every play list themselves.
+
+Several worker processes may publish into the same file; the unique alert
+key makes a repeat insert a no-op, so each alert is stored once.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from qc_rules import AnomalyChecker, classify_issue
+
+ALERTS_DB            = os.environ.get("CAPP_ALERTS_DB", "qc_alerts.db")   # "" disables
+ALERT_RETENTION_DAYS = int(os.environ.get("CAPP_ALERT_RETENTION_DAYS", "7"))
+
+_COLUMNS = ("id", "game_id", "league", "severity", "type", "message",
+            "play_index", "home_name", "away_name", "created_at")
+
+
+class AlertStore:
+    """Append-only alert log; ids increase, so clients page with `since`."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS alerts ("
+                     " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                     " key TEXT UNIQUE NOT NULL,"
+                     " game_id TEXT NOT NULL,"
+                     " league TEXT,"
+                     " severity TEXT NOT NULL,"
+                     " type TEXT NOT NULL,"
+                     " message TEXT NOT NULL,"
+                     " play_index INTEGER,"
+                     " home_name TEXT,"
+                     " away_name TEXT,"
+                     " created_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS alerts_game ON alerts (game_id, id)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, alerts):
+        """Insert alert dicts (each with a "key"); already-seen keys are
+        skipped.  Returns the number of new alerts."""
+        conn = self._conn()
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO alerts (key, game_id, league, severity, type, message,"
+            " play_index, home_name, away_name, created_at)"
+            " VALUES (:key, :game_id, :league, :severity, :type, :message,"
+            " :play_index, :home_name, :away_name, :created_at)", alerts)
+        return conn.total_changes - before
+
+    def since(self, since_id=None, game_ids=None, limit=500):
+        """Alerts with id > since_id, oldest first.  since_id None returns
+        the newest `limit` alerts."""
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM alerts WHERE id > ?"
+        args = [since_id or 0]
+        if game_ids:
+            sql += f" AND game_id IN ({', '.join('?' * len(game_ids))})"
+            args.extend(game_ids)
+        sql += " ORDER BY id DESC LIMIT ?" if since_id is None else " ORDER BY id LIMIT ?"
+        args.append(limit)
+        rows = [dict(zip(_COLUMNS, row)) for row in self._conn().execute(sql, args)]
+        return rows[::-1] if since_id is None else rows
+
+    def prune(self, max_age_days=None):
+        """Delete alerts older than the retention window.  Returns the count."""
+        max_age_days = ALERT_RETENTION_DAYS if max_age_days is None else max_age_days
+        cur = self._conn().execute("DELETE FROM alerts WHERE created_at < ?",
+                                   (time.time() - max_age_days * 86400,))
+        return cur.rowcount
+
+
+_checker = AnomalyChecker()
+_tracked = set()     # game ids with incremental state in _checker
+_store = None
+_lock = threading.Lock()
+
+
+def _alert_store():
+    global _store
+    if not ALERTS_DB:
+        return None
+    with _lock:
+        if _store is None:
+            _store = AlertStore(ALERTS_DB)
+        return _store
+
+
+def evaluate(game_id, result):
+    """Run the QC rules on one mapped result.  Returns alert dicts (not yet
+    stored), keyed the same way the QC Monitor deduplicates them."""
+    entries = result.get("entries", [])
+    hname = result.get("home_name", "Home")
+    aname = result.get("away_name", "Away")
+    base = {"game_id": str(game_id), "league": result.get("league"),
+            "home_name": hname, "away_name": aname, "created_at": time.time()}
+    alerts = []
+
+    final = result.get("status") == "post"
+    with _lock:
+        issues = _checker.check_incremental(game_id, entries, hname, aname)
+        if final:
+            _checker.forget(game_id)
+            _tracked.discard(game_id)
+        else:
+            _tracked.add(game_id)
+    for issue in issues:
+        sev, msg, _ = classify_issue(issue, entries)
+        alerts.append(dict(base, key=f"{game_id}:{issue['type']}:{msg}", severity=sev,
+                           type=issue["type"], message=msg,
+                           play_index=issue.get("play_index", -1)))
+    return alerts
+
+
+def forget_games(keep_ids):
+    """Drop incremental check state for every game not in `keep_ids`.  A
+    game's state is normally dropped when it is checked as final; this
+    catches games that left the live set without a final check (postponed,
+    cancelled, or published as final by another process).  Returns the
+    number of games forgotten."""
+    keep_ids = {str(gid) for gid in keep_ids}
+    with _lock:
+        gone = [gid for gid in _tracked if str(gid) not in keep_ids]
+        for gid in gone:
+            _tracked.discard(gid)
+            _checker.forget(gid)
+    return len(gone)
+
+
+def check_game(game_id, result):
+    """Evaluate a freshly mapped game and store any new alerts.  Returns the
+    number of alerts that were new."""
+    store = _alert_store()
+    if store is None:
+        return 0
+    alerts = evaluate(game_id, result)
+    return store.add(alerts) if alerts else 0
+
+
+def report_stall(game_id, result, plays, idle):
+    """Store a "stalled" alert for a live game whose play count has sat at
+    `plays` for `idle` seconds.  The poller decides this (see
+    espn_fetcher._check_stalls) — a frozen feed never reaches evaluate().
+    `result` is the game's cached result, for its names.  Returns the
+    number of alerts that were new."""
+    store = _alert_store()
+    if store is None:
+        return 0
+    return store.add([{
+        "key": f"{game_id}:stalled:{plays}", "game_id": str(game_id),
+        "league": result.get("league"), "home_name": result.get("home_name", "Home"),
+        "away_name": result.get("away_name", "Away"), "created_at": time.time(),
+        "severity": "INFO", "type": "stalled", "play_index": -1,
+        "message": f"Play count unchanged at {plays} plays for {idle / 60:.0f} min",
+    }])
+
+
+def get_alerts(since=None, game_ids=None, limit=500):
+    """{"last_id", "alerts"} — pass last_id back as `since` next time.
+    Without `since`, the newest `limit` alerts are returned."""
+    store = _alert_store()
+    if store is None:
+        return {"last_id": since or 0, "alerts": []}
+    alerts = store.since(since, game_ids, limit)
+    return {"last_id": alerts[-1]["id"] if alerts else since or 0, "alerts": alerts}
+
+
+def prune_alerts():
+    store = _alert_store()
+    return store.prune() if store is not None else 0
@@ -0,0 +1,273 @@
+"""
+CAPP Data Server - Historical QC Jobs
+Runs the QC rule set over a whole week or season on the server instead of
+on the operator's laptop.  A job lists the week's (or every week's) games
+from the scoreboard, fetches and maps the games in parallel — through the
+same upstream governor as everything else, so a big job can't exceed the
+ESPN rate limit — and produces the summary counts the QC Monitor shows
+plus each game's issue list.  Each game's entries are packed into
+qc_batch columns as they arrive and the rules run once, vectorized, over
+the whole job at the end.
+
+Jobs are keyed by their parameters and the pipeline version: submitting
+the same week again returns the running or completed job rather than
+starting over, until QC_JOB_CACHE_TTL passes.  In shared-cache mode job
+state lives in the shared store, so any worker can report on any job.  A
+queued or running job that hasn't saved progress for QC_JOB_STALE_AFTER
+is taken to be dead (its worker exited) and a resubmit starts a new one.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import espn_fetcher
+import qc_batch
+from qc_rules import summarize_reports
+
+QC_JOB_WORKERS   = int(os.environ.get("CAPP_QC_JOB_WORKERS", "8"))
+QC_JOB_CACHE_TTL = int(os.environ.get("CAPP_QC_JOB_CACHE_TTL", str(24 * 3600)))
+QC_JOB_STALE_AFTER = int(os.environ.get("CAPP_QC_JOB_STALE_AFTER", "300"))
+
+NFL_REGULAR_WEEKS    = range(1, 19)
+NFL_POSTSEASON_WEEKS = range(1, 6)
+
+AUTO_FIXED_NOTE = "[auto-fixed — no red row in CAPP]"
+
+_jobs = {}          # job_id -> job dict (this process)
+_job_keys = {}      # params key -> job_id
+_cancelled = set()
+_lock = threading.Lock()
+
+
+# ============================================================
+# Job State
+# ============================================================
+
+def _save_job(job):
+    """Publish a snapshot of `job`.  The runner keeps updating its own dict;
+    readers only ever see snapshots, which are never modified.  Returns
+    the snapshot."""
+    job["updated_at"] = time.time()     # heartbeat: see _is_stale
+    snapshot = dict(job)
+    store = espn_fetcher._shared_store()
+    if store is not None:
+        store.put(f"qcjob:{job['job_id']}", snapshot)
+        store.put(f"qcjob_key:{job['key']}", job["job_id"])
+        return snapshot
+    with _lock:
+        _jobs[job["job_id"]] = snapshot
+        _job_keys[job["key"]] = job["job_id"]
+    return snapshot
+
+def _load_job(job_id):
+    store = espn_fetcher._shared_store()
+    if store is not None:
+        return store.get(f"qcjob:{job_id}")
+    with _lock:
+        return _jobs.get(job_id)
+
+def _job_for_key(key):
+    store = espn_fetcher._shared_store()
+    if store is not None:
+        job_id = store.get(f"qcjob_key:{key}")
+    else:
+        with _lock:
+            job_id = _job_keys.get(key)
+    return _load_job(job_id) if job_id else None
+
+def _is_stale(job):
+    """A queued or running job whose runner stopped saving progress —
+    the worker running it exited or restarted."""
+    return (job["state"] in ("queued", "running")
+            and time.time() - job.get("updated_at", job["created_at"]) > QC_JOB_STALE_AFTER)
+
+def _is_cancelled(job_id):
+    store = espn_fetcher._shared_store()
+    if store is not None:
+        return store.get(f"qcjob_cancel:{job_id}", False)
+    with _lock:
+        return job_id in _cancelled
+
+
+# ============================================================
+# Game Listing + Checking
+# ============================================================
+
+def _season_weeks(league, year, seasontype):
+    if league == "nfl":
+        return list(NFL_POSTSEASON_WEEKS if seasontype == 3 else NFL_REGULAR_WEEKS)
+    if seasontype == 3:
+        return [1]      # CFB postseason is one date range
+    return sorted(espn_fetcher._SEASON_WEEK_DATES.get(year, {}))
+
+def _list_games(league, year, week, seasontype):
+    """Games for one week, or every week of the season when week is None."""
+    games, seen = [], set()
+    for lg in (["cfb", "nfl"] if league == "all" else [league]):
+        weeks = [week] if week is not None else _season_weeks(lg, year, seasontype)
+        for wk in weeks:
+            for g in espn_fetcher._fetch_historical_games(lg, year, wk, seasontype):
+                if g["game_id"] not in seen:
+                    seen.add(g["game_id"])
+                    games.append(g)
+    return games
+
+def _game_result(game):
+    """(mapped result, version) for a finished game — the cached result when
+    it is final and on the current pipeline, otherwise fetched and mapped
+    now.  The version is the upstream body digest plus pipeline version, so
+    it only changes when the game's data or its mapping does.  A fetched
+    game is neither archived nor remembered in the live validators or
+    cache: a season job touches thousands of games the server doesn't
+    otherwise serve, and a rerun within QC_JOB_CACHE_TTL reuses the job."""
+    gid, league = game["game_id"], game.get("league", "cfb")
+    cached = espn_fetcher._cached_plays(gid)
+    with espn_fetcher._lock:
+        known = espn_fetcher._upstream_validators.get(gid)
+    if (cached and known and cached.get("status") == "post"
+            and cached.get("pipeline_version") == espn_fetcher.PIPELINE_VERSION):
+        return cached, f"{espn_fetcher.PIPELINE_VERSION}:{known['digest']}"
+    raw, validators = espn_fetcher._fetch_summary_raw(gid, league)
+    result = espn_fetcher._map_raw_batch([(raw, league)])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result, f"{espn_fetcher.PIPELINE_VERSION}:{validators['digest']}"
+
+def check_packed(packed, metas):
+    """Run the QC rules over every packed game.  Returns per-game reports
+    in `metas` order (one meta dict per packed game)."""
+    issues = qc_batch.check_batch(packed)
+    reports = []
+    for meta, game_issues in zip(metas, qc_batch.classify_batch(packed, issues, AUTO_FIXED_NOTE)):
+        reports.append(dict(meta, issues=[
+            {"severity": severity, "raw_severity": issue["severity"],
+             "type": issue["type"], "message": message,
+             "play_index": issue.get("play_index", -1), "auto_fixed": auto_fixed}
+            for issue, severity, message, auto_fixed in game_issues]))
+    return reports
+
+# ============================================================
+# Runner
+# ============================================================
+
+def _run_job(job):
+    job.update(state="running", started_at=time.time())
+    _save_job(job)
+    try:
+        games = _list_games(job["league"], job["year"], job["week"], job["seasontype"])
+    except Exception as e:
+        job.update(state="error", error=str(e), finished_at=time.time())
+        _save_job(job)
+        return
+    job.update(total=len(games), checked=0)
+    _save_job(job)
+
+    packer = qc_batch.BatchPacker()
+    packed_metas, failed = [], []
+    progress_lock = threading.Lock()
+
+    def _one(game):
+        if _is_cancelled(job["job_id"]):
+            return
+        meta = {"game_id": game["game_id"], "league": game.get("league"),
+                "home_team": game.get("home_team", ""), "away_team": game.get("away_team", "")}
+        try:
+            result, meta["version"] = _game_result(game)
+        except Exception as e:
+            result = None
+            meta.update(plays=0, issues=[], error=f"Failed to fetch plays: {e}")
+        with progress_lock:
+            if result is None:
+                failed.append(meta)
+            else:
+                entries = result.get("entries", [])
+                hname = result.get("home_name", meta["home_team"])
+                aname = result.get("away_name", meta["away_team"])
+                packer.add(entries, hname, aname, game["game_id"])
+                packed_metas.append(dict(meta, home_name=hname, away_name=aname,
+                                         plays=len(entries)))
+            job.update(checked=len(packed_metas) + len(failed),
+                       current=f"{meta['away_team'][:12]} @ {meta['home_team'][:12]}")
+            _save_job(job)
+
+    with ThreadPoolExecutor(max_workers=QC_JOB_WORKERS, thread_name_prefix="qcjob") as pool:
+        list(pool.map(_one, games))
+
+    if _is_cancelled(job["job_id"]):
+        job.update(state="cancelled", finished_at=time.time())
+        _save_job(job)
+        return
+    reports = check_packed(packer.finish(), packed_metas) + failed
+    order = {g["game_id"]: i for i, g in enumerate(games)}
+    reports.sort(key=lambda r: order[r["game_id"]])
+    job.update(state="done", finished_at=time.time(),
+               summary=summarize_reports(reports), games=reports)
+    _save_job(job)
+
+
+# ============================================================
+# Public API
+# ============================================================
+
+def _public(job, include_games=False):
+    if include_games:
+        return job
+    return {k: v for k, v in job.items() if k != "games"}
+
+def submit_job(league, year, week=None, seasontype=2, refresh=False):
+    """Start (or reuse) a QC job for one week, or the whole season when
+    week is None.  Returns the job status."""
+    key = f"{league}:{year}:{'season' if week is None else week}:{seasontype}:" \
+          f"v{espn_fetcher.PIPELINE_VERSION}"
+    existing = _job_for_key(key)
+    if existing and not refresh and not _is_stale(existing):
+        fresh = time.time() - existing.get("finished_at", time.time()) < QC_JOB_CACHE_TTL
+        if existing["state"] in ("queued", "running") or (existing["state"] == "done" and fresh):
+            return _public(existing)
+
+    job = {"job_id": uuid.uuid4().hex[:12], "key": key, "league": league,
+           "year": year, "week": week, "seasontype": seasontype,
+           "state": "queued", "total": None, "checked": 0, "current": "",
+           "created_at": time.time()}
+    snapshot = _save_job(job)
+    threading.Thread(target=_run_job, args=(job,), daemon=True,
+                     name=f"qcjob-{job['job_id']}").start()
+    return _public(snapshot)
+
+def get_job(job_id, include_games=False):
+    """Job status (and, once done, the summary); None for an unknown id.
+    A job whose runner died is reported as "error"."""
+    job = _load_job(job_id)
+    if job and _is_stale(job):
+        job = dict(job, state="error", error="Job stopped making progress (worker exited)")
+    return _public(job, include_games) if job else None
+
+def get_results(job_id, game_ids=None, versions_only=False):
+    """A finished job's per-game reports, optionally only `game_ids`.  With
+    versions_only, {game_id: version} instead — lets a client that kept
+    earlier reports download only the games that changed."""
+    job = _load_job(job_id)
+    if job is None or job["state"] != "done":
+        return job and _public(job)
+    games = job["games"]
+    if game_ids:
+        wanted = set(game_ids)
+        games = [g for g in games if g["game_id"] in wanted]
+    out = _public(job)
+    if versions_only:
+        out["versions"] = {g["game_id"]: g.get("version") for g in games}
+    else:
+        out["games"] = games
+    return out
+
+def cancel_job(job_id):
+    store = espn_fetcher._shared_store()
+    if store is not None:
+        store.put(f"qcjob_cancel:{job_id}", True)
+    else:
+        with _lock:
+            _cancelled.add(job_id)
+    return get_job(job_id)
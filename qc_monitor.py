@@ -7,14 +7,32 @@ from the CAPP data server. Detects anomalies and alerts the operator.
 import tkinter as tk
 from tkinter import ttk
 import customtkinter as ctk
+import json
+import os
 import threading
 import time
-import requests
 import winsound
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-SERVER_URL   = "https://capp-data-server.onrender.com"
+from capp_client import CappClient
+from qc_rules import summarize_reports
+from ui_dispatch import SoundThrottle, UIDispatcher, ui_probe
+
 POLL_INTERVAL = 30
+# Monitored live games hold a server interest lease (fast poll cadence),
+# renewed every poll; three polls' worth so one missed renewal is harmless.
+INTEREST_LEASE = POLL_INTERVAL * 3
+
+# Historical QC results are checkpointed per (league, year, week) so a
+# re-run only downloads reports that are missing or changed on the server.
+CHECKPOINT_DIR   = os.path.join(os.path.expanduser("~"), ".capp_qc", "checkpoints")
+QC_FETCH_CHUNK   = 25    # game reports per results request
+QC_FETCH_WORKERS = 4     # results requests in flight
+
+MAX_ALERTS    = 2000     # alerts kept (and shown) — oldest drop off the bottom
+MAX_SEEN_KEYS = 20000    # dedup keys remembered, least recently seen evicted
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -31,99 +49,66 @@ ORANGE   = "#d97706"
 RED      = "#cf3130"
 
 # ============================================================
-# Anomaly Detection Engine
+# Alert Store
 # ============================================================
 
-class AnomalyChecker:
-    """Runs all QC checks on a list of CAPP-mapped play entries."""
-
-    # Valid positive score increments:
-    #   0 = no score, 1 = EP good, 2 = 2PT conversion, 3 = safety/FG-unlikely but valid
-    #   6 = TD only (EP follows separately), 7 = TD+EP bundled by ESPN, 8 = TD+2PT bundled
-    VALID_INCREMENTS = {0, 1, 2, 3, 6, 7, 8}
-
-    # These negative deltas are expected lag artifacts when ESPN bundles TD+EP/2PT into
-    # a single score update — they are NOT genuine score regressions.
-    BUNDLED_LAG_ARTIFACTS = {-7, -8}
-
-    STUCK_THRESHOLD  = 4
-
-    def check(self, entries, home_name="Home", away_name="Away"):
-        issues = []
-        if not entries:
-            return issues
-        self._check_stuck_clock(entries, issues)
-        self._check_score_jumps(entries, home_name, away_name, issues)
-        self._check_missing_ep(entries, home_name, away_name, issues)
-        self._check_zero_field_position(entries, issues)
-        return issues
-
-    def _check_stuck_clock(self, entries, issues):
-        streak = 1
-        for i in range(1, len(entries)):
-            c = entries[i]
-            p = entries[i - 1]
-            if (c.get("clock") == p.get("clock")
-                    and c.get("quarter") == p.get("quarter")
-                    and str(c.get("down", "")) not in ("KO", "EP", "2PT")):
-                streak += 1
-                if streak == self.STUCK_THRESHOLD:
-                    issues.append({
-                        "severity": "WARNING",
-                        "type": "stuck_clock",
-                        "message": f"Clock stuck at {c.get('clock')} for {streak}+ plays in Q{c.get('quarter')}",
-                        "play_index": i,
-                    })
-            else:
-                streak = 1
-
-    def _check_score_jumps(self, entries, home_name, away_name, issues):
-        for i in range(1, len(entries)):
-            hd = entries[i].get("home_score", 0) - entries[i - 1].get("home_score", 0)
-            ad = entries[i].get("away_score", 0) - entries[i - 1].get("away_score", 0)
-            for delta, team in ((hd, home_name), (ad, away_name)):
-                if delta == 0:
-                    continue
-                if delta in self.BUNDLED_LAG_ARTIFACTS:
-                    # Lag mirror of bundled TD+EP/2PT — expected data artifact, not a real regression
-                    issues.append({"severity": "INFO", "type": "bundled_score_artifact",
-                        "message": f"{team} bundled-score lag artifact ({delta:+d}) at play #{i + 1}",
-                        "play_index": i})
-                elif delta < 0:
-                    issues.append({"severity": "ERROR", "type": "score_regression",
-                        "message": f"{team} score decreased by {abs(delta)} at play #{i + 1}",
-                        "play_index": i})
-                elif delta not in self.VALID_INCREMENTS:
-                    issues.append({"severity": "WARNING", "type": "invalid_score_jump",
-                        "message": f"{team} score jumped by {delta} at play #{i + 1} (unexpected value)",
-                        "play_index": i})
-
-    def _check_missing_ep(self, entries, home_name, away_name, issues):
-        for i in range(1, len(entries)):
-            hd = entries[i].get("home_score", 0) - entries[i - 1].get("home_score", 0)
-            ad = entries[i].get("away_score", 0) - entries[i - 1].get("away_score", 0)
-            if hd == 6 or ad == 6:
-                scorer = home_name if hd == 6 else away_name
-                n1 = str(entries[i].get("down", "")) if i < len(entries) else ""
-                n2 = str(entries[i + 1].get("down", "")) if i + 1 < len(entries) else ""
-                if n1 not in ("EP", "2PT") and n2 not in ("EP", "2PT"):
-                    # If the +6 delta lands on a KO, the missing EP is on the
-                    # preceding TD — point to that row instead of the kickoff.
-                    flag_idx = i - 1 if n1 == "KO" and i > 0 else i
-                    issues.append({"severity": "WARNING", "type": "missing_ep",
-                        "message": f"TD by {scorer} at play #{flag_idx + 1} — no EP or 2PT row follows",
-                        "play_index": flag_idx})
-
-    def _check_zero_field_position(self, entries, issues):
-        count = sum(
-            1 for e in entries
-            if e.get("field_position") == 0
-            and str(e.get("down", "")) in ("1", "2", "3", "4")
-        )
-        if count > 3:
-            issues.append({"severity": "INFO", "type": "missing_fp",
-                "message": f"{count} scrimmage plays have field_position=0 (missing data)",
-                "play_index": 0})
+class AlertStore:
+    """
+    Alerts raised this session.  Severity and per-game counters answer the
+    badge and row-colour questions in O(1); the alerts themselves sit in a
+    ring buffer of MAX_ALERTS; dedup keys are an LRU of MAX_SEEN_KEYS.
+    Counters cover every alert since the last clear(), including ones that
+    have dropped out of the ring buffer.  mark_seen() is called from
+    worker threads, so everything is guarded by one lock.
+    """
+
+    def __init__(self, max_alerts=MAX_ALERTS, max_keys=MAX_SEEN_KEYS):
+        self._alerts  = deque(maxlen=max_alerts)
+        self._seen    = OrderedDict()
+        self._max_keys = max_keys
+        self._by_severity = Counter()
+        self._by_game = {}          # game_id -> Counter of severities
+        self._lock = threading.Lock()
+
+    def mark_seen(self, key):
+        """True the first time `key` is seen (within the LRU window)."""
+        with self._lock:
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                return False
+            self._seen[key] = None
+            if len(self._seen) > self._max_keys:
+                self._seen.popitem(last=False)
+            return True
+
+    def add(self, alert):
+        """Record an alert.  Returns the alert pushed out of the ring
+        buffer, if any, so its row can be removed from the view."""
+        with self._lock:
+            evicted = self._alerts[0] if len(self._alerts) == self._alerts.maxlen else None
+            self._alerts.append(alert)
+            self._by_severity[alert["severity"]] += 1
+            self._by_game.setdefault(alert["game_id"], Counter())[alert["severity"]] += 1
+            return evicted
+
+    def count(self, severity):
+        with self._lock:
+            return self._by_severity[severity]
+
+    def has_alerts(self, game_id):
+        with self._lock:
+            return game_id in self._by_game
+
+    def game_counts(self, game_id):
+        with self._lock:
+            return dict(self._by_game.get(game_id, {}))
+
+    def clear(self):
+        with self._lock:
+            self._alerts.clear()
+            self._seen.clear()
+            self._by_severity.clear()
+            self._by_game.clear()
 
 
 # ============================================================
@@ -138,20 +123,29 @@ class QCMonitor:
         self.root.configure(bg=BG_DEEP)
 
         self._monitored    = {}        # game_id -> game dict
-        self._play_counts  = {}        # game_id -> int
         self._game_entries = {}        # game_id -> entries list
-        self._seen_keys    = set()     # dedup alert keys
-        self._all_alerts   = []        # list of alert dicts
+        self._play_log_gid  = None     # game currently rendered in the play log
+        self._play_log_rows = []       # [(iid, values, tag)] as rendered, in order
+        self._alerts       = AlertStore()
         self._paused       = False
         self._selected_id  = None
-        self._checker      = AnomalyChecker()
         self._game_iid_map = {}        # iid -> game_id
+        self._games        = {}        # game_id -> game dict from the /games feed
+        self._games_version = 0        # last /games change-feed version applied
+        self._alert_cursor = None      # last /alerts id seen (None = not polled yet)
+        self._alerts_backfilled = set()  # monitored game ids whose alert backlog was loaded
+        self._play_versions = {}       # game_id -> fetched_at of the plays last downloaded
+        self._client       = CappClient()   # pooled keep-alive session shared by every call
+        self._fetch_pool   = ThreadPoolExecutor(max_workers=4, thread_name_prefix="qc-fetch")
         self._qc_game_list         = []    # all games from last historical QC run
         self._qc_games_with_issues = set() # game IDs that had ERROR or WARNING
         self._filter_issues_only   = False
         self._qc_cancel    = threading.Event()  # set to abort in-progress historical run
+        self._ui           = UIDispatcher(root)     # worker threads post UI updates here
+        self._sound        = SoundThrottle(winsound.Beep)
 
         self._build_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self._start_polling()
 
     # ─── UI Construction ─────────────────────────────────────
@@ -483,78 +477,111 @@ class QCMonitor:
                 try:
                     self._poll_once()
                 except Exception as e:
-                    self.root.after(0, lambda err=e: self.status_lbl.configure(
+                    self._ui.post_latest("status", lambda err=e: self.status_lbl.configure(
                         text=f"Poll error: {err}", text_color=RED))
             time.sleep(POLL_INTERVAL)
 
+    def _sync_games(self):
+        """Apply the /games change feed since the last poll.  Returns the set
+        of game ids that changed, or None when the whole list was replaced."""
+        data = self._client.games(league="all", since=self._games_version)
+        if isinstance(data, list):              # server without the change feed
+            self._games = {g["game_id"]: g for g in data}
+            return None
+        self._games_version = data["version"]
+        if data.get("reset"):
+            self._games = {g["game_id"]: g for g in data["games"]}
+            return None
+        for g in data["added"] + data["changed"]:
+            self._games[g["game_id"]] = g
+        for g in data["removed"]:
+            self._games.pop(g["game_id"], None)
+        return {g["game_id"] for g in data["added"] + data["changed"] + data["removed"]}
+
     def _poll_once(self):
-        r = requests.get(f"{SERVER_URL}/games", params={"league": "all"}, timeout=15)
-        r.raise_for_status()
-        live = [g for g in r.json() if g.get("status") == "in"]
+        # The three requests are independent — run them side by side.  The
+        # selected game is looked up here, before _sync_games starts
+        # replacing self._games on a worker.
+        selected = self._games.get(self._selected_id)
+        games_f  = self._fetch_pool.submit(self._sync_games)
+        alerts_f = self._fetch_pool.submit(self._fetch_alerts)
+        plays_f  = self._fetch_pool.submit(self._fetch_selected_plays, selected)
+
+        changed_ids = games_f.result()
+        live = [g for g in self._games.values() if g.get("status") == "in"]
         now = datetime.now().strftime("%I:%M:%S %p")
-        self.root.after(0, self._update_game_list, live, now)
+        self._ui.post(self._update_game_list, live, now, changed_ids)
+        interest_f = self._fetch_pool.submit(
+            self._renew_interest, [g["game_id"] for g in live if g["game_id"] in self._monitored])
 
-        for g in live:
-            gid = g["game_id"]
+        alerts, cursor, backfilled = alerts_f.result()
+        for a in alerts:
+            gid = a["game_id"]
             if gid not in self._monitored:
                 continue
+            key = f"{gid}:{a['type']}:{a['message']}"
+            if self._alerts.mark_seen(key):
+                game = {"game_id": gid, "home_team": a.get("home_name") or "",
+                        "away_team": a.get("away_name") or ""}
+                self._ui.post(self._add_alert, game, a["severity"], a["message"])
+        # Only now are these alerts safely queued — a poll that failed
+        # before this point fetches them again next time
+        self._alert_cursor = cursor
+        self._alerts_backfilled.update(backfilled)
+        plays_f.result()
+        interest_f.result()
+
+    def _renew_interest(self, game_ids):
+        for gid in game_ids:
             try:
-                league = g.get("league", "cfb")
-                pr = requests.get(f"{SERVER_URL}/game/{gid}/plays",
-                                  params={"league": league}, timeout=20)
-                pr.raise_for_status()
-                data    = pr.json()
-                entries = data.get("entries", [])
-                hname   = data.get("home_name", "Home")
-                aname   = data.get("away_name", "Away")
-
-                self._game_entries[gid] = entries
-
-                # Stalled play count check
-                prev = self._play_counts.get(gid, -1)
-                curr = len(entries)
-                self._play_counts[gid] = curr
-                if 0 < prev == curr:
-                    key = f"{gid}:stalled:{curr}"
-                    if key not in self._seen_keys:
-                        self._seen_keys.add(key)
-                        self.root.after(0, self._add_alert, g, "INFO",
-                            f"Play count unchanged at {curr} plays since last poll")
-
-                # Anomaly checks
-                for issue in self._checker.check(entries, hname, aname):
-                    pidx = issue.get("play_index", -1)
-                    server_qc = entries[pidx].get("qc_issue", "") if 0 <= pidx < len(entries) else None
-                    # Score-related issues are NEVER assumed auto-fixed — an
-                    # empty server qc_issue could mean the pipeline produced
-                    # wrong data that the QC check didn't catch (e.g. EP on
-                    # wrong team for a punt return TD).  Only clock/fp issues
-                    # can be safely downgraded when the server says clean.
-                    _score_types = {"score_regression", "invalid_score_jump",
-                                    "missing_ep", "bundled_score_artifact"}
-                    is_score_issue = issue["type"] in _score_types
-                    auto_fixed = (not is_score_issue
-                                  and server_qc is not None and server_qc == ""
-                                  and issue["severity"] in ("ERROR", "WARNING"))
-                    msg = issue["message"]
-                    if auto_fixed:
-                        msg = f"{msg}  [auto-fixed by pipeline — no red row in CAPP]"
-                    sev = "INFO" if auto_fixed else issue["severity"]
-                    key = f"{gid}:{issue['type']}:{msg}"
-                    if key not in self._seen_keys:
-                        self._seen_keys.add(key)
-                        self.root.after(0, self._add_alert, g, sev, msg)
-
-                if self._selected_id == gid:
-                    self.root.after(0, self._refresh_play_log,
-                                    gid, hname, aname)
+                self._client.interest(gid, lease=INTEREST_LEASE)
             except Exception as e:
-                self.root.after(0, self._add_alert, g, "ERROR",
-                                f"Failed to fetch plays: {e}")
+                print(f"Interest renewal failed for {gid}: {e}")
+
+    def _release_interest(self, game_ids):
+        for gid in game_ids:
+            try:
+                self._client.release_interest(gid)
+            except Exception as e:
+                print(f"Interest release failed for {gid}: {e}")
+
+    def _fetch_alerts(self):
+        """The server runs the QC rules as it re-maps each game — only new
+        alerts come down.  A newly monitored game first gets its backlog.
+        Returns (alerts, new cursor, backfilled game ids); the caller
+        commits the last two once the alerts are dispatched."""
+        new_ids = [gid for gid in list(self._monitored) if gid not in self._alerts_backfilled]
+        alerts = []
+        if new_ids:
+            alerts.extend(self._client.alerts(game_ids=new_ids)["alerts"])
+        feed = self._client.alerts(since=self._alert_cursor)
+        alerts.extend(feed["alerts"])
+        return alerts, feed["last_id"], new_ids
+
+    def _fetch_selected_plays(self, g):
+        """Plays are only requested for the monitored game whose log is on
+        screen, conditionally — the server answers 304 unless it has newer
+        data."""
+        if g is None or g["game_id"] not in self._monitored:
+            return
+        gid = g["game_id"]
+        try:
+            data = self._client.plays(gid, g.get("league", "cfb"))
+            version = data.get("fetched_at")
+            if version and version == self._play_versions.get(gid) and gid in self._game_entries:
+                return
+            self._game_entries[gid] = data.get("entries", [])
+            self._play_versions[gid] = data.get("fetched_at")
+            self._ui.post_latest("play_log", self._refresh_play_log, gid,
+                                 data.get("home_name", "Home"), data.get("away_name", "Away"))
+        except Exception as e:
+            self._ui.post(self._add_alert, g, "ERROR", f"Failed to fetch plays: {e}")
 
     # ─── UI Updates ───────────────────────────────────────────
 
-    def _update_game_list(self, live_games, timestamp):
+    def _update_game_list(self, live_games, timestamp, changed_ids=None):
+        """Sync the game tree with the live list.  With `changed_ids`, rows
+        for games that didn't change since the last poll are left alone."""
         live_ids   = {g["game_id"] for g in live_games}
         gid_to_iid = {v: k for k, v in self._game_iid_map.items()}
 
@@ -571,12 +598,14 @@ class QCMonitor:
 
         for g in live_games:
             gid   = g["game_id"]
+            if changed_ids is not None and gid in gid_to_iid and gid not in changed_ids:
+                continue
             home  = g.get("home_team", g.get("home", ""))[:16]
             away  = g.get("away_team", g.get("away", ""))[:16]
             label = f"{away} @ {home}"
             mon   = gid in self._monitored
             dot   = "●" if mon else "○"
-            has_alert = any(a["game_id"] == gid for a in self._all_alerts)
+            has_alert = self._alerts.has_alerts(gid)
             tag   = "alert" if has_alert else ("on" if mon else "off")
             qc    = "ON" if mon else "—"
 
@@ -600,15 +629,20 @@ class QCMonitor:
         label = f"{away} / {home}"
         gid   = game.get("game_id", "")
 
-        self._all_alerts.insert(0, {"time": now, "severity": severity,
-                                     "game": label, "message": message,
-                                     "game_id": gid})
-        self.alert_tree.insert("", 0,
+        iid = self.alert_tree.insert("", 0,
             values=(now, severity, label, message),
             tags=(severity.lower(),))
+        evicted = self._alerts.add({"time": now, "severity": severity,
+                                    "game": label, "message": message,
+                                    "game_id": gid, "iid": iid})
+        if evicted is not None:
+            try:
+                self.alert_tree.delete(evicted["iid"])
+            except Exception:
+                pass
 
-        errs  = sum(1 for a in self._all_alerts if a["severity"] == "ERROR")
-        warns = sum(1 for a in self._all_alerts if a["severity"] == "WARNING")
+        errs  = self._alerts.count("ERROR")
+        warns = self._alerts.count("WARNING")
         if errs + warns:
             self.alert_badge.configure(
                 text=f"⚠  {errs} ERR   {warns} WARN")
@@ -616,9 +650,8 @@ class QCMonitor:
             self.alert_badge.configure(text="")
 
         if self.sound_var.get() and severity in ("ERROR", "WARNING"):
-            freq = 1200 if severity == "ERROR" else 800
-            threading.Thread(
-                target=lambda: winsound.Beep(freq, 300), daemon=True).start()
+            error = severity == "ERROR"
+            self._sound.play(1200 if error else 800, 300, priority=int(error))
 
         # Mark game row red
         for iid, gid2 in self._game_iid_map.items():
@@ -626,9 +659,19 @@ class QCMonitor:
                 self.game_tree.item(iid, tags=("alert",))
 
     def _refresh_play_log(self, gid, hname, aname):
+        """Bring the play log in line with the game's entries by diffing
+        against what is on screen: changed rows are updated in place, new
+        rows appended, vanished rows removed.  Switching games rebuilds."""
+        started = time.perf_counter()
         entries = self._game_entries.get(gid, [])
-
-        self.play_tree.delete(*self.play_tree.get_children())
+        if gid != self._play_log_gid:
+            self.play_tree.delete(*self.play_tree.get_children())
+            self._play_log_rows = []
+            self._play_log_gid = gid
+        at_bottom = self.play_tree.yview()[1] >= 0.999
+
+        rows = self._play_log_rows
+        added = changed = 0
         for i, e in enumerate(entries):
             # Use the server's qc_issue field — this is the ground truth for
             # what CAPP will show as red rows.  Issues fixed by the pipeline
@@ -636,7 +679,7 @@ class QCMonitor:
             # qc_issue="" even if the local checker might flag them.
             qc = e.get("qc_issue", "")
             tag = "flagged" if qc else ("odd" if i % 2 else "even")
-            self.play_tree.insert("", "end", tags=(tag,), values=(
+            values = (
                 i + 1,
                 e.get("home_score", ""),
                 e.get("away_score", ""),
@@ -649,15 +692,31 @@ class QCMonitor:
                 e.get("possession", ""),
                 e.get("play_text", ""),
                 qc,
-            ))
-
-        children = self.play_tree.get_children()
-        if children:
-            self.play_tree.see(children[-1])
+            )
+            if i < len(rows):
+                iid, old_values, old_tag = rows[i]
+                if values != old_values or tag != old_tag:
+                    self.play_tree.item(iid, values=values, tags=(tag,))
+                    rows[i] = (iid, values, tag)
+                    changed += 1
+            else:
+                iid = self.play_tree.insert("", "end", tags=(tag,), values=values)
+                rows.append((iid, values, tag))
+                added += 1
+        removed = len(rows) - len(entries)
+        if removed > 0:
+            self.play_tree.delete(*(iid for iid, _, _ in rows[len(entries):]))
+            del rows[len(entries):]
+
+        # Follow the tail only if the operator hasn't scrolled up to read
+        if rows and added and at_bottom:
+            self.play_tree.see(rows[-1][0])
 
         self.play_count_lbl.configure(text=f"{len(entries)} plays")
         self.play_lbl.configure(
             text=f"Play Log — {aname} @ {hname}", text_color=WHITE)
+        ui_probe("play log", started,
+                  f"{gid}: +{added} ~{changed} -{max(removed, 0)} of {len(entries)} rows")
 
     # ─── Controls ─────────────────────────────────────────────
 
@@ -670,14 +729,16 @@ class QCMonitor:
             return
         if gid in self._monitored:
             del self._monitored[gid]
+            self._fetch_pool.submit(self._release_interest, [gid])
         else:
             vals = self.game_tree.item(sel[0], "values")
             self._monitored[gid] = {"game_id": gid}
+            self._fetch_pool.submit(self._renew_interest, [gid])
         self._refresh_game_row(sel[0], gid)
 
     def _refresh_game_row(self, iid, gid):
         mon = gid in self._monitored
-        has_alert = any(a["game_id"] == gid for a in self._all_alerts)
+        has_alert = self._alerts.has_alerts(gid)
         dot = "●" if mon else "○"
         qc  = "ON" if mon else "—"
         tag = "alert" if has_alert else ("on" if mon else "off")
@@ -693,19 +754,40 @@ class QCMonitor:
             return
         self._selected_id = gid
         entries = self._game_entries.get(gid)
+        game = self._games.get(gid) or next(
+            (g for g in self._qc_game_list if g["game_id"] == gid), None)
         if entries is not None:
             self._refresh_play_log(gid, "Home", "Away")
+        elif game is not None:
+            # QC runs on the server — plays are only loaded for the game on screen
+            self.play_lbl.configure(text="Play Log — loading...", text_color=MUTED)
+            self._fetch_pool.submit(self._load_play_log, game)
         else:
             self.play_lbl.configure(
                 text="Play Log — monitoring will load plays on next poll",
                 text_color=MUTED)
 
+    def _load_play_log(self, g):
+        gid = g["game_id"]
+        try:
+            data = self._client.plays(gid, g.get("league", "cfb"))
+            self._game_entries[gid] = data.get("entries", [])
+            self._play_versions[gid] = data.get("fetched_at")
+            if self._selected_id == gid:
+                self._ui.post_latest("play_log", self._refresh_play_log, gid,
+                                     data.get("home_name", "Home"), data.get("away_name", "Away"))
+        except Exception as e:
+            self._ui.post(lambda err=e: self.play_lbl.configure(
+                text=f"Play Log — failed to load: {err}", text_color=RED))
+
     def _monitor_all(self):
         for iid, gid in self._game_iid_map.items():
             self._monitored[gid] = {"game_id": gid}
             self._refresh_game_row(iid, gid)
+        self._fetch_pool.submit(self._renew_interest, list(self._monitored))
 
     def _monitor_none(self):
+        self._fetch_pool.submit(self._release_interest, list(self._monitored))
         self._monitored.clear()
         for iid, gid in self._game_iid_map.items():
             self._refresh_game_row(iid, gid)
@@ -720,118 +802,109 @@ class QCMonitor:
                          args=(league, year, week), daemon=True).start()
 
     def _historical_qc_worker(self, league, year, week):
+        """Run the week's QC as a server job: the server fetches, maps and
+        checks every game in parallel; this thread only follows progress
+        and renders the results."""
         self._qc_cancel.clear()
         try:
-            r = requests.get(f"{SERVER_URL}/games",
-                             params={"league": league, "year": year, "week": week},
-                             timeout=15)
-            r.raise_for_status()
-            games = r.json()
+            job = self._client.post("/qc/jobs",
+                                    params={"league": league, "year": year, "week": week})
+            job_id = job["job_id"]
+
+            while job["state"] in ("queued", "running"):
+                if self._qc_cancel.is_set():
+                    # Reset was pressed — abandon this run
+                    self._client.delete(f"/qc/jobs/{job_id}")
+                    return
+                if job.get("total"):
+                    self._ui.post_latest("hist_progress", lambda j=job: self.hist_progress.configure(
+                        text=f"Checking {j['checked']}/{j['total']}: {j.get('current', '')}"))
+                time.sleep(1)
+                job = self._client.get(f"/qc/jobs/{job_id}")
+
+            if job["state"] != "done":
+                raise RuntimeError(job.get("error") or f"QC job {job['state']}")
+            games = self._download_reports(job_id, league, year, week)
+            if games is None:
+                return  # Reset was pressed mid-download — the checkpoint keeps what arrived
+            s = summarize_reports(games)
 
             if not games:
-                self.root.after(0, lambda: self.hist_progress.configure(
+                self._ui.post_latest("hist_progress", lambda: self.hist_progress.configure(
                     text="No games found for that week."))
-                self.root.after(0, lambda: self.run_qc_btn.configure(
+                self._ui.post(lambda: self.run_qc_btn.configure(
                     state="normal", text="Run QC Check"))
                 return
 
-            total  = len(games)
-            issues_found = 0
-            games_with_issues = set()
-            games_with_score  = set()
-            games_with_clock  = set()
-            games_with_ep     = set()
-            total_plays       = 0
-            flagged_play_keys = set()   # (gid, play_index) — unique flagged plays
-
-            for idx, g in enumerate(games):
+            for g in games:
                 if self._qc_cancel.is_set():
-                    return  # Reset was pressed — abandon this run
-                gid    = g["game_id"]
-                gleague = g.get("league", league)
-                home   = g.get("home_team", g.get("home", ""))
-                away   = g.get("away_team", g.get("away", ""))
-
-                self.root.after(0, lambda i=idx, t=total, a=away, h=home:
-                    self.hist_progress.configure(
-                        text=f"Checking {i+1}/{t}: {a[:12]} @ {h[:12]}"))
-
-                try:
-                    pr = requests.get(f"{SERVER_URL}/game/{gid}/plays",
-                                      params={"league": gleague}, timeout=20)
-                    pr.raise_for_status()
-                    data    = pr.json()
-                    entries = data.get("entries", [])
-                    hname   = data.get("home_name", home)
-                    aname   = data.get("away_name", away)
-
-                    self._game_entries[gid] = entries
-                    total_plays += len(entries)
-
-                    # Add to game list display
-                    self.root.after(0, self._add_historical_game_row, g)
-
-                    issues = self._checker.check(entries, hname, aname)
-                    for issue in issues:
-                        sev  = issue["severity"]
-                        typ  = issue["type"]
-                        pidx = issue.get("play_index", -1)
-                        server_qc = entries[pidx].get("qc_issue", "") if 0 <= pidx < len(entries) else None
-                        # Score-related issues are NEVER assumed auto-fixed — an
-                        # empty server qc_issue could mean the pipeline produced
-                        # wrong data that the QC check didn't catch (e.g. EP on
-                        # wrong team for a punt return TD).  Only clock/fp issues
-                        # can be safely downgraded when the server says clean.
-                        _score_types = {"score_regression", "invalid_score_jump",
-                                        "missing_ep", "bundled_score_artifact"}
-                        is_score_issue = typ in _score_types
-                        auto_fixed = (not is_score_issue
-                                      and server_qc is not None and server_qc == ""
-                                      and sev in ("ERROR", "WARNING"))
-                        msg = issue["message"]
-                        if auto_fixed:
-                            msg = f"{msg}  [auto-fixed — no red row in CAPP]"
-                        disp_sev = "INFO" if auto_fixed else sev
-                        # Only count toward "games with issues" if genuinely unfixed
-                        if sev in ("ERROR", "WARNING") and not auto_fixed:
-                            games_with_issues.add(gid)
-                            if pidx >= 0:
-                                flagged_play_keys.add((gid, pidx))
-                            if typ in ("score_regression", "invalid_score_jump"):
-                                games_with_score.add(gid)
-                            elif typ == "stuck_clock":
-                                games_with_clock.add(gid)
-                            elif typ == "missing_ep":
-                                games_with_ep.add(gid)
-                        issues_found += 1
-                        key = f"{gid}:{typ}:{msg}"
-                        if key not in self._seen_keys:
-                            self._seen_keys.add(key)
-                            self.root.after(0, self._add_alert, g, disp_sev, msg)
-
-                    if not issues:
-                        self.root.after(0, self._add_alert, g, "OK",
-                                        f"No issues found — {len(entries)} plays checked")
-
-                except Exception as e:
-                    self.root.after(0, self._add_alert, g, "ERROR",
-                                    f"Failed to fetch plays: {e}")
-
-            summary = f"Done — {total} games, {issues_found} issue(s) found"
-            self.root.after(0, lambda: self.hist_progress.configure(
+                    return
+                gid = g["game_id"]
+                self._ui.post(self._add_historical_game_row, g)
+                if g.get("error"):
+                    self._ui.post(self._add_alert, g, "ERROR", g["error"])
+                    continue
+                for issue in g["issues"]:
+                    key = f"{gid}:{issue['type']}:{issue['message']}"
+                    if self._alerts.mark_seen(key):
+                        self._ui.post(self._add_alert, g,
+                                      issue["severity"], issue["message"])
+                if not g["issues"]:
+                    self._ui.post(self._add_alert, g, "OK",
+                                  f"No issues found — {g['plays']} plays checked")
+
+            issues_found = s["issues_found"]
+            summary = f"Done — {s['total']} games, {issues_found} issue(s) found"
+            self._ui.post_latest("hist_progress", lambda: self.hist_progress.configure(
                 text=summary, text_color=GREEN if issues_found == 0 else ORANGE))
-            self.root.after(0, self._finish_historical_qc,
-                            list(games), games_with_issues, total,
-                            games_with_score, games_with_clock, games_with_ep,
-                            total_plays, len(flagged_play_keys))
+            self._ui.post(self._finish_historical_qc,
+                          list(games), set(s["games_with_issues"]), s["total"],
+                          set(s["games_with_score"]), set(s["games_with_clock"]),
+                          set(s["games_with_ep"]), s["total_plays"], s["flagged_plays"])
 
         except Exception as e:
-            self.root.after(0, lambda: self.hist_progress.configure(
-                text=f"Error: {e}", text_color=RED))
+            self._ui.post_latest("hist_progress", lambda err=e: self.hist_progress.configure(
+                text=f"Error: {err}", text_color=RED))
 
-        self.root.after(0, lambda: self.run_qc_btn.configure(
+        self._ui.post(lambda: self.run_qc_btn.configure(
             state="normal", text="Run QC Check"))
 
+    def _download_reports(self, job_id, league, year, week):
+        """Bring this week's checkpoint file up to date with the job's
+        results.  Only reports that are missing or whose version changed are
+        downloaded, QC_FETCH_CHUNK games per request with QC_FETCH_WORKERS
+        requests in flight; the file is rewritten after every chunk so a
+        cancelled or crashed run resumes where it stopped.  Returns the
+        reports in the job's game order, or None if cancelled."""
+        results_path = f"/qc/jobs/{job_id}/results"
+        versions = self._client.get(results_path, params={"versions_only": True}, timeout=30)["versions"]
+
+        path = _checkpoint_path(league, year, week)
+        saved = {gid: rep for gid, rep in _load_checkpoint(path).items() if gid in versions}
+        need = [gid for gid, v in versions.items()
+                if v is None or saved.get(gid, {}).get("version") != v]
+        reused = len(versions) - len(need)
+
+        def fetch(ids):
+            return self._client.get(results_path, params={"game_id": ids}, timeout=60)["games"]
+
+        done = reused
+        chunks = [need[i:i + QC_FETCH_CHUNK] for i in range(0, len(need), QC_FETCH_CHUNK)]
+        pool = ThreadPoolExecutor(max_workers=QC_FETCH_WORKERS, thread_name_prefix="qc-results")
+        try:
+            for reports in pool.map(fetch, chunks):
+                if self._qc_cancel.is_set():
+                    return None
+                for rep in reports:
+                    saved[rep["game_id"]] = rep
+                _save_checkpoint(path, saved)
+                done += len(reports)
+                self._ui.post_latest("hist_progress", lambda d=done, t=len(versions): self.hist_progress.configure(
+                    text=f"Loaded {d}/{t} game reports ({reused} from checkpoint)"))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return [saved[gid] for gid in versions if gid in saved]
+
     def _add_historical_game_row(self, g):
         gid  = g["game_id"]
         home = g.get("home_team", g.get("home", ""))[:16]
@@ -944,24 +1017,32 @@ class QCMonitor:
             self.status_lbl.configure(text="Resuming...", text_color=MUTED)
 
     def _clear_alerts(self):
-        self._all_alerts.clear()
-        self._seen_keys.clear()
+        self._alerts.clear()
         self.alert_tree.delete(*self.alert_tree.get_children())
         self.alert_badge.configure(text="")
         for iid, gid in self._game_iid_map.items():
             self._refresh_game_row(iid, gid)
 
+    def _on_close(self):
+        """Give the server back our interest leases before exiting — they
+        would otherwise keep fast polling going until they expire."""
+        release = self._fetch_pool.submit(self._release_interest, list(self._monitored))
+        try:
+            release.result(timeout=5)
+        except Exception:
+            pass
+        self.root.destroy()
+
     def _reset_all(self):
         """Stop any in-progress QC run and reset the entire monitor to a clean state."""
         # Cancel a running historical QC worker (it checks this flag between games)
         self._qc_cancel.set()
 
         # Clear all state
+        self._fetch_pool.submit(self._release_interest, list(self._monitored))
         self._monitored.clear()
-        self._play_counts.clear()
         self._game_entries.clear()
-        self._seen_keys.clear()
-        self._all_alerts.clear()
+        self._alerts.clear()
         self._selected_id = None
         self._qc_game_list = []
         self._qc_games_with_issues = set()
@@ -970,12 +1051,18 @@ class QCMonitor:
         # Clear all three trees
         self.alert_tree.delete(*self.alert_tree.get_children())
         self.play_tree.delete(*self.play_tree.get_children())
+        self._play_log_gid = None
+        self._play_log_rows = []
         for iid in list(self._game_iid_map.keys()):
             try:
                 self.game_tree.delete(iid)
             except Exception:
                 pass
         self._game_iid_map.clear()
+        self._games = {}
+        self._games_version = 0
+        self._alerts_backfilled.clear()
+        self._play_versions.clear()
 
         # Reset header
         self.alert_badge.configure(text="")
@@ -999,9 +1086,29 @@ class QCMonitor:
         # Reset historical progress label and re-enable Run button
         self.hist_progress.configure(text="", text_color=MUTED)
         self.run_qc_btn.configure(state="normal", text="Run QC Check")
+        # _qc_cancel stays set until the next run starts (the worker clears
+        # it), so the running worker sees it on its next check
 
-        # Re-arm the cancel event for future runs
-        self._qc_cancel.clear()
+
+def _checkpoint_path(league, year, week):
+    return os.path.join(CHECKPOINT_DIR, f"{league}_{year}_w{week}.json")
+
+
+def _load_checkpoint(path):
+    """{game_id: report} from a checkpoint file; {} if missing or corrupt."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_checkpoint(path, reports):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(reports, f)
+    os.replace(tmp, path)   # a crash mid-write never leaves a truncated file
 
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+"""
+CAPP QC Rules
+Anomaly checks shared by the QC Monitor and the data server's QC engine,
+so a play list is judged the same way wherever it is checked.
+"""
+
+# ============================================================
+# Anomaly Detection Engine
+# ============================================================
+
+class AnomalyChecker:
+    """Runs all QC checks on a list of CAPP-mapped play entries."""
+
+    # Valid positive score increments:
+    #   0 = no score, 1 = EP good, 2 = 2PT conversion, 3 = safety/FG-unlikely but valid
+    #   6 = TD only (EP follows separately), 7 = TD+EP bundled by ESPN, 8 = TD+2PT bundled
+    VALID_INCREMENTS = {0, 1, 2, 3, 6, 7, 8}
+
+    # These negative deltas are expected lag artifacts when ESPN bundles TD+EP/2PT into
+    # a single score update — they are NOT genuine score regressions.
+    BUNDLED_LAG_ARTIFACTS = {-7, -8}
+
+    STUCK_THRESHOLD  = 4
+
+    def __init__(self):
+        self._games = {}    # game key -> _GameState for check_incremental
+
+    def check(self, entries, home_name="Home", away_name="Away"):
+        issues = []
+        if not entries:
+            return issues
+        self._check_stuck_clock(entries, issues)
+        self._check_score_jumps(entries, home_name, away_name, issues)
+        self._check_missing_ep(entries, home_name, away_name, issues)
+        self._check_zero_field_position(entries, issues)
+        return issues
+
+    def check_incremental(self, game_key, entries, home_name="Home", away_name="Away"):
+        """
+        Streaming form of check() for a game polled over and over.  Keeps
+        per-game state (a fingerprint of every checked row, the running
+        stuck-clock streak, the zero-field-position count) and only runs the
+        rules from the first row that is new or differs from last time — a
+        retroactive server correction re-checks from that row onward, plus
+        the one row before it whose missing-EP look-ahead it affects.
+        Returns only issues not already returned for this game.
+        """
+        state = self._games.get(game_key)
+        if state is None or state.names != (home_name, away_name):
+            state = self._games[game_key] = _GameState(home_name, away_name)
+        keys = [_row_key(e) for e in entries]
+        old = state.keys
+        start = next((i for i, (a, b) in enumerate(zip(keys, old)) if a != b),
+                     min(len(keys), len(old)))
+        if start == len(keys) == len(old):
+            return []
+
+        del state.streaks[max(start, 1):]
+        del state.fp_counts[start:]
+        state.keys = keys
+        issues = []
+        if entries:
+            self._check_stuck_clock(entries, issues, start=max(start, 1),
+                                    streak=state.streaks[-1], streaks=state.streaks)
+            self._check_score_jumps(entries, home_name, away_name, issues, start=max(start, 1))
+            self._check_missing_ep(entries, home_name, away_name, issues, start=max(start - 1, 1))
+            count = state.fp_counts[-1] if state.fp_counts else 0
+            for e in entries[start:]:
+                count += self._zero_fp(e)
+                state.fp_counts.append(count)
+            if count > 3:
+                issues.append(self._zero_fp_issue(count))
+
+        new = []
+        for issue in issues:
+            key = (issue["type"], issue["message"])
+            if key not in state.emitted:
+                state.emitted.add(key)
+                new.append(issue)
+        return new
+
+    def forget(self, game_key):
+        """Drop check_incremental state for a game (e.g. once it is final)."""
+        self._games.pop(game_key, None)
+
+    def _check_stuck_clock(self, entries, issues, start=1, streak=1, streaks=None):
+        for i in range(start, len(entries)):
+            c = entries[i]
+            p = entries[i - 1]
+            if (c.get("clock") == p.get("clock")
+                    and c.get("quarter") == p.get("quarter")
+                    and str(c.get("down", "")) not in ("KO", "EP", "2PT")):
+                streak += 1
+                if streak == self.STUCK_THRESHOLD:
+                    issues.append({
+                        "severity": "WARNING",
+                        "type": "stuck_clock",
+                        "message": f"Clock stuck at {c.get('clock')} for {streak}+ plays in Q{c.get('quarter')}",
+                        "play_index": i,
+                    })
+            else:
+                streak = 1
+            if streaks is not None:
+                streaks.append(streak)
+
+    def _check_score_jumps(self, entries, home_name, away_name, issues, start=1):
+        for i in range(start, len(entries)):
+            hd = entries[i].get("home_score", 0) - entries[i - 1].get("home_score", 0)
+            ad = entries[i].get("away_score", 0) - entries[i - 1].get("away_score", 0)
+            for delta, team in ((hd, home_name), (ad, away_name)):
+                if delta == 0:
+                    continue
+                if delta in self.BUNDLED_LAG_ARTIFACTS:
+                    # Lag mirror of bundled TD+EP/2PT — expected data artifact, not a real regression
+                    issues.append({"severity": "INFO", "type": "bundled_score_artifact",
+                        "message": f"{team} bundled-score lag artifact ({delta:+d}) at play #{i + 1}",
+                        "play_index": i})
+                elif delta < 0:
+                    issues.append({"severity": "ERROR", "type": "score_regression",
+                        "message": f"{team} score decreased by {abs(delta)} at play #{i + 1}",
+                        "play_index": i})
+                elif delta not in self.VALID_INCREMENTS:
+                    issues.append({"severity": "WARNING", "type": "invalid_score_jump",
+                        "message": f"{team} score jumped by {delta} at play #{i + 1} (unexpected value)",
+                        "play_index": i})
+
+    def _check_missing_ep(self, entries, home_name, away_name, issues, start=1):
+        for i in range(start, len(entries)):
+            hd = entries[i].get("home_score", 0) - entries[i - 1].get("home_score", 0)
+            ad = entries[i].get("away_score", 0) - entries[i - 1].get("away_score", 0)
+            if hd == 6 or ad == 6:
+                scorer = home_name if hd == 6 else away_name
+                n1 = str(entries[i].get("down", "")) if i < len(entries) else ""
+                n2 = str(entries[i + 1].get("down", "")) if i + 1 < len(entries) else ""
+                if n1 not in ("EP", "2PT") and n2 not in ("EP", "2PT"):
+                    # If the +6 delta lands on a KO, the missing EP is on the
+                    # preceding TD — point to that row instead of the kickoff.
+                    flag_idx = i - 1 if n1 == "KO" and i > 0 else i
+                    issues.append({"severity": "WARNING", "type": "missing_ep",
+                        "message": f"TD by {scorer} at play #{flag_idx + 1} — no EP or 2PT row follows",
+                        "play_index": flag_idx})
+
+    @staticmethod
+    def _zero_fp(e):
+        return e.get("field_position") == 0 and str(e.get("down", "")) in ("1", "2", "3", "4")
+
+    @staticmethod
+    def _zero_fp_issue(count):
+        return {"severity": "INFO", "type": "missing_fp",
+                "message": f"{count} scrimmage plays have field_position=0 (missing data)",
+                "play_index": 0}
+
+    def _check_zero_field_position(self, entries, issues):
+        count = sum(1 for e in entries if self._zero_fp(e))
+        if count > 3:
+            issues.append(self._zero_fp_issue(count))
+
+
+class _GameState:
+    """check_incremental bookkeeping for one game."""
+
+    def __init__(self, home_name, away_name):
+        self.names = (home_name, away_name)
+        self.keys = []          # _row_key of every row checked so far
+        self.streaks = [1]      # stuck-clock streak ending at each row
+        self.fp_counts = []     # zero-field-position scrimmage rows up to each row
+        self.emitted = set()    # (type, message) already returned
+
+
+def _row_key(e):
+    """Every field the rules (and classify_issue) read from one entry."""
+    return (e.get("home_score", 0), e.get("away_score", 0), e.get("clock"),
+            e.get("quarter"), str(e.get("down", "")), e.get("field_position"),
+            e.get("qc_issue", ""))
+
+
+# Score-related issues are NEVER assumed auto-fixed — an empty server
+# qc_issue could mean the pipeline produced wrong data that the QC check
+# didn't catch (e.g. EP on wrong team for a punt return TD).  Only clock/fp
+# issues can be safely downgraded when the server says clean.
+SCORE_ISSUE_TYPES = {"score_regression", "invalid_score_jump",
+                     "missing_ep", "bundled_score_artifact"}
+
+AUTO_FIXED_NOTE = "[auto-fixed by pipeline — no red row in CAPP]"
+
+
+def classify_issue(issue, entries, note=AUTO_FIXED_NOTE):
+    """
+    Resolve one checker issue against the server's qc_issue flags.
+    Returns (severity, message, auto_fixed) — auto-fixed issues are shown
+    as INFO with `note` appended to the message.
+    """
+    pidx = issue.get("play_index", -1)
+    server_qc = entries[pidx].get("qc_issue", "") if 0 <= pidx < len(entries) else None
+    auto_fixed = (issue["type"] not in SCORE_ISSUE_TYPES
+                  and server_qc is not None and server_qc == ""
+                  and issue["severity"] in ("ERROR", "WARNING"))
+    if auto_fixed:
+        return "INFO", f"{issue['message']}  {note}", True
+    return issue["severity"], issue["message"], False
+
+
+def summarize_reports(reports):
+    """
+    Historical QC summary counts over per-game reports (as produced by the
+    server's QC jobs): what the QC Monitor's summary panel shows.
+    """
+    games_with_issues, with_score, with_clock, with_ep = set(), set(), set(), set()
+    flagged = set()
+    issues_found = total_plays = 0
+    for rep in reports:
+        gid = rep["game_id"]
+        total_plays += rep.get("plays", 0)
+        for issue in rep.get("issues", []):
+            issues_found += 1
+            # Only count toward "games with issues" if genuinely unfixed
+            if issue["raw_severity"] not in ("ERROR", "WARNING") or issue["auto_fixed"]:
+                continue
+            games_with_issues.add(gid)
+            if issue["play_index"] >= 0:
+                flagged.add((gid, issue["play_index"]))
+            if issue["type"] in ("score_regression", "invalid_score_jump"):
+                with_score.add(gid)
+            elif issue["type"] == "stuck_clock":
+                with_clock.add(gid)
+            elif issue["type"] == "missing_ep":
+                with_ep.add(gid)
+    return {"total": len(reports), "issues_found": issues_found,
+            "games_with_issues": sorted(games_with_issues),
+            "games_with_score": sorted(with_score),
+            "games_with_clock": sorted(with_clock),
+            "games_with_ep": sorted(with_ep),
+            "total_plays": total_plays, "flagged_plays": len(flagged)}
@@ -0,0 +1,108 @@
+"""
+CAPP Data Server - Raw Upstream Response Archive
+Keeps gzip-compressed ESPN summary bodies per game and fetch time so mapped
+results can be rebuilt (or a past poll reproduced) without touching ESPN.
+
+Layout:  <ARCHIVE_DIR>/<league>/<game_id>/<fetched_at_ms>.json.gz
+"""
+
+import gzip
+import os
+import time
+
+ARCHIVE_DIR            = os.environ.get("CAPP_ARCHIVE_DIR", "raw_archive")   # "" disables
+ARCHIVE_RETENTION_DAYS = int(os.environ.get("CAPP_ARCHIVE_RETENTION_DAYS", "14"))
+
+_SUFFIX = ".json.gz"
+
+
+def archive_enabled():
+    return bool(ARCHIVE_DIR)
+
+
+def _game_dir(league, game_id):
+    return os.path.join(ARCHIVE_DIR, league, str(game_id))
+
+
+def archive_response(game_id, league, raw, fetched_at=None):
+    """Write one raw summary body.  Returns the file path, or None when the
+    archive is disabled."""
+    if not archive_enabled():
+        return None
+    fetched_at = time.time() if fetched_at is None else fetched_at
+    folder = _game_dir(league, game_id)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{int(fetched_at * 1000)}{_SUFFIX}")
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wb", compresslevel=6) as f:
+        f.write(raw)
+    os.replace(tmp, path)   # readers never see a half-written file
+    return path
+
+
+def _snapshots(league, game_id):
+    """Sorted list of archived fetch times (unix seconds) for one game."""
+    try:
+        names = os.listdir(_game_dir(league, game_id))
+    except FileNotFoundError:
+        return []
+    return sorted(int(n[:-len(_SUFFIX)]) / 1000 for n in names if n.endswith(_SUFFIX))
+
+
+def archived_games():
+    """List (league, game_id) for every game with at least one snapshot."""
+    if not archive_enabled() or not os.path.isdir(ARCHIVE_DIR):
+        return []
+    games = []
+    for league in sorted(os.listdir(ARCHIVE_DIR)):
+        league_dir = os.path.join(ARCHIVE_DIR, league)
+        if not os.path.isdir(league_dir):
+            continue
+        for game_id in sorted(os.listdir(league_dir)):
+            if _snapshots(league, game_id):
+                games.append((league, game_id))
+    return games
+
+
+def find_league(game_id):
+    """Return the league a game was archived under, or None."""
+    for league, gid in archived_games():
+        if gid == str(game_id):
+            return league
+    return None
+
+
+def load_response(game_id, league, at=None):
+    """
+    Return (fetched_at, raw_bytes) for the newest snapshot taken at or before
+    `at` (unix seconds; None = newest overall), or None if nothing matches.
+    """
+    times = [t for t in _snapshots(league, game_id) if at is None or t <= at]
+    if not times:
+        return None
+    fetched_at = times[-1]
+    path = os.path.join(_game_dir(league, game_id), f"{int(round(fetched_at * 1000))}{_SUFFIX}")
+    with gzip.open(path, "rb") as f:
+        return fetched_at, f.read()
+
+
+def prune_archive(max_age_days=None):
+    """Delete snapshots older than the retention window.  Returns the number
+    of files removed."""
+    if not archive_enabled() or not os.path.isdir(ARCHIVE_DIR):
+        return 0
+    max_age_days = ARCHIVE_RETENTION_DAYS if max_age_days is None else max_age_days
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for league, game_id in archived_games():
+        folder = _game_dir(league, game_id)
+        for t in _snapshots(league, game_id):
+            if t < cutoff:
+                try:
+                    os.remove(os.path.join(folder, f"{int(round(t * 1000))}{_SUFFIX}"))
+                    removed += 1
+                except OSError:
+                    pass
+        if not os.listdir(folder):
+            os.rmdir(folder)
+    return removed
@@ -0,0 +1,122 @@
+"""
+CAPP Data Server - Shared Cache Store
+Lets several uvicorn worker processes share one poller's state.
+
+SQLiteStore is a small JSON key/value table in a WAL-mode SQLite file —
+readers never block the writer, and every process on the box sees the same
+games list and mapped play results.  LeaderLock is an exclusive,
+non-blocking file lock; whichever process holds it runs the poller.  The
+OS drops the lock when its holder dies, so another worker takes over.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:   # Windows dev box
+    fcntl = None
+    import msvcrt
+
+
+class SQLiteStore:
+    """JSON values keyed by string, each stamped with a write version."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._memo = {}              # key -> (version, value) decoded this process
+        self._memo_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS kv ("
+                     " key TEXT PRIMARY KEY,"
+                     " value TEXT NOT NULL,"
+                     " version REAL NOT NULL)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, key, value):
+        version = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (key, value, version) VALUES (?, ?, ?)",
+            (key, json.dumps(value), version))
+        with self._memo_lock:
+            self._memo[key] = (version, value)
+        return version
+
+    def version(self, key):
+        row = self._conn().execute("SELECT version FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, key, default=None):
+        """Return the stored value.  Values are decoded once per write and
+        shared between callers in this process — treat them as read-only."""
+        version = self.version(key)
+        if version is None:
+            return default
+        with self._memo_lock:
+            memo = self._memo.get(key)
+        if memo and memo[0] == version:
+            return memo[1]
+        row = self._conn().execute("SELECT value, version FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        value = json.loads(row[0])
+        with self._memo_lock:
+            self._memo[key] = (row[1], value)
+        return value
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+        with self._memo_lock:
+            self._memo.pop(key, None)
+
+    def items(self, prefix):
+        """Return {key: value} for every key starting with prefix."""
+        rows = self._conn().execute(
+            "SELECT key, value FROM kv WHERE key >= ? AND key < ?",
+            (prefix, prefix + "\uffff")).fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+
+class LeaderLock:
+    """Exclusive non-blocking lock on a file, held for the process lifetime."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+
+    @property
+    def held(self):
+        return self._fh is not None
+
+    def try_acquire(self):
+        if self._fh is not None:
+            return True
+        fh = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            fh.close()
+            return False
+        fh.seek(0)
+        fh.truncate()
+        fh.write(str(os.getpid()))
+        fh.flush()
+        self._fh = fh
+        return True
@@ -0,0 +1,77 @@
+"""Circuit breaker handling in UpstreamGovernor.get: a half-open trial that
+never reaches ESPN must not leave the breaker stuck, and a request the
+breaker refuses must not spend a rate-limit token."""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from upstream import CircuitOpenError, DeadlineExceeded, UpstreamError, UpstreamGovernor
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+class _Session:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+
+    def get(self, url, **kwargs):
+        return _Response(self.statuses.pop(0) if self.statuses else 200)
+
+
+def _half_open_governor():
+    """A governor whose "summary" breaker has opened and is due a trial."""
+    gov = UpstreamGovernor(_Session([500]), rate=1000, burst=1000, max_retries=0,
+                           breaker_threshold=1, breaker_reset=0.05, acquire_timeout=1)
+    gov.get("summary", "http://espn.invalid/summary")
+    assert gov.stats()["summary"]["circuit"] == "open"
+    with pytest.raises(CircuitOpenError):
+        gov.get("summary", "http://espn.invalid/summary")
+    time.sleep(0.06)
+    return gov
+
+
+def test_trial_past_deadline_does_not_wedge_breaker():
+    gov = _half_open_governor()
+    with pytest.raises(DeadlineExceeded):
+        gov.get("summary", "http://espn.invalid/summary", deadline=time.monotonic() - 1)
+    assert gov.get("summary", "http://espn.invalid/summary").status_code == 200
+    assert gov.stats()["summary"]["circuit"] == "closed"
+
+
+def test_trial_refused_by_rate_limit_does_not_wedge_breaker():
+    gov = _half_open_governor()
+    gov.bucket.pause(0.3)       # e.g. a 429 Retry-After longer than acquire_timeout
+    gov.acquire_timeout = 0.01
+    with pytest.raises(UpstreamError):
+        gov.get("summary", "http://espn.invalid/summary")
+    time.sleep(0.3)
+    assert gov.get("summary", "http://espn.invalid/summary").status_code == 200
+    assert gov.stats()["summary"]["circuit"] == "closed"
+
+
+def test_trial_with_unexpected_error_releases_breaker():
+    gov = _half_open_governor()
+    gov.session = None          # AttributeError inside the attempt
+    with pytest.raises(AttributeError):
+        gov.get("summary", "http://espn.invalid/summary")
+    gov.session = _Session([])
+    assert gov.get("summary", "http://espn.invalid/summary").status_code == 200
+
+
+def test_refused_request_keeps_its_token():
+    gov = UpstreamGovernor(_Session([]), rate=0.01, burst=1, acquire_timeout=0.01)
+    breaker = gov._breaker("summary")
+    breaker.state, breaker._trial_in_flight = "half-open", True    # another caller's trial
+    with pytest.raises(CircuitOpenError):
+        gov.get("summary", "http://espn.invalid/summary")
+    breaker.record_success()
+    assert gov.get("summary", "http://espn.invalid/summary").status_code == 200
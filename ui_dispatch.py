@@ -0,0 +1,211 @@
+"""
+CAPP UI Dispatch
+Frame-coalesced UI updates for the Tk desktop tools.  Worker threads post
+updates to a UIDispatcher instead of calling root.after(0, ...) once per
+alert / row / progress tick; the Tk thread drains the queue on a fixed
+frame cadence, within a per-frame time budget, so a burst of thousands of
+updates costs a handful of event-loop wakeups instead of thousands.
+
+SoundThrottle plays alert beeps from a single thread, at most one per
+SOUND_MIN_INTERVAL: beeps requested while one is pending are merged into
+it (the most urgent wins) instead of each getting its own thread.
+
+CAPP_UI_PROBE=1 prints UI timing: dispatcher queue depth and apply time
+once a second, and whatever the apps time with ui_probe().  StartupProbe
+records launch milestones (first paint, first data) and appends them to a
+log file, since the packaged apps have no console.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+UI_PROBE = os.environ.get("CAPP_UI_PROBE", "") == "1"
+
+FRAME_MS           = 33      # ~30 frames a second
+FRAME_BUDGET_MS    = 12      # updates left over after this wait for the next frame
+SOUND_MIN_INTERVAL = 1.5     # seconds between beeps
+
+
+def ui_probe(label, started, detail=""):
+    """Report a UI update's duration (since perf_counter() `started`) when
+    CAPP_UI_PROBE=1."""
+    if UI_PROBE:
+        print(f"[ui] {label}: {(time.perf_counter() - started) * 1000:.1f} ms  {detail}")
+
+
+# ============================================================
+# Update Dispatcher
+# ============================================================
+
+class UIDispatcher:
+    """
+    Queue of UI callbacks applied on the Tk thread once per frame.
+
+    post() queues a call; every posted call runs, in order.  post_latest()
+    queues a call under a key and replaces any call with the same key that
+    hasn't run yet — for status text and progress counters, where only the
+    newest value matters.  Both are safe to call from any thread.
+    """
+
+    def __init__(self, root, frame_ms=FRAME_MS, budget_ms=FRAME_BUDGET_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.budget = budget_ms / 1000
+        self._queue = deque()       # (key or None, fn, args)
+        self._latest = {}           # key -> (fn, args) still to run
+        self._lock = threading.Lock()
+        self._stats = {"applied": 0, "frames": 0, "max_depth": 0, "max_apply_ms": 0.0}
+        self._reported = time.monotonic()
+        self.root.after(self.frame_ms, self._frame)
+
+    def post(self, fn, *args):
+        with self._lock:
+            self._queue.append((None, fn, args))
+
+    def post_latest(self, key, fn, *args):
+        with self._lock:
+            if key not in self._latest:
+                self._queue.append((key, None, None))
+            self._latest[key] = (fn, args)
+
+    def depth(self):
+        with self._lock:
+            return len(self._queue)
+
+    def stats(self):
+        """Counters since the last probe report: updates applied, frames
+        that had work, and the worst queue depth and apply time seen."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _frame(self):
+        started = time.perf_counter()
+        with self._lock:
+            depth = len(self._queue)
+        applied = 0
+        while time.perf_counter() - started < self.budget:
+            with self._lock:
+                if not self._queue:
+                    break
+                key, fn, args = self._queue.popleft()
+                if key is not None:
+                    fn, args = self._latest.pop(key)
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"UI update error: {e}")
+            applied += 1
+
+        if applied:
+            elapsed = (time.perf_counter() - started) * 1000
+            with self._lock:
+                s = self._stats
+                s["applied"] += applied
+                s["frames"] += 1
+                s["max_depth"] = max(s["max_depth"], depth)
+                s["max_apply_ms"] = max(s["max_apply_ms"], elapsed)
+        if UI_PROBE and time.monotonic() - self._reported >= 1:
+            self._report()
+        self.root.after(self.frame_ms, self._frame)
+
+    def _report(self):
+        self._reported = time.monotonic()
+        with self._lock:
+            s, depth = self._stats, len(self._queue)
+            self._stats = {"applied": 0, "frames": 0, "max_depth": 0, "max_apply_ms": 0.0}
+        if s["applied"]:
+            print(f"[ui] dispatch: {s['applied']} updates in {s['frames']} frames, "
+                  f"max depth {s['max_depth']}, max apply {s['max_apply_ms']:.1f} ms, "
+                  f"pending {depth}")
+
+
+# ============================================================
+# Startup Probe
+# ============================================================
+
+class StartupProbe:
+    """
+    Milestones since `launched` (a perf_counter() taken as early as the
+    app could).  The first mark of each label counts; finish() writes one
+    line with every milestone to `log_path`.
+    """
+
+    def __init__(self, launched, log_path):
+        self.launched = launched
+        self.log_path = log_path
+        self._marks = {}
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def mark(self, label):
+        ms = (time.perf_counter() - self.launched) * 1000
+        with self._lock:
+            if label in self._marks:
+                return
+            self._marks[label] = ms
+        if UI_PROBE:
+            print(f"[startup] {label}: {ms:.0f} ms")
+
+    def finish(self):
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            marks = dict(self._marks)
+        line = "  ".join(f"{label}={ms:.0f}ms" for label, ms in marks.items())
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(f"{datetime.now():%Y-%m-%d %H:%M:%S}  {line}\n")
+        except OSError as e:
+            print(f"Startup log write failed: {e}")
+
+
+# ============================================================
+# Sound Throttle
+# ============================================================
+
+class SoundThrottle:
+    """Rate-limited, coalescing beeper.  `beep(freq, duration_ms)` is the
+    platform call (winsound.Beep) and runs on one background thread."""
+
+    def __init__(self, beep, min_interval=SOUND_MIN_INTERVAL):
+        self._beep = beep
+        self.min_interval = min_interval
+        self._pending = None        # (priority, freq, duration)
+        self._last = 0.0
+        self._cond = threading.Condition()
+        self.played = self.merged = 0
+        threading.Thread(target=self._run, daemon=True, name="ui-sound").start()
+
+    def play(self, freq, duration=300, priority=0):
+        """Request a beep.  If one is already waiting, keep whichever has
+        the higher priority."""
+        with self._cond:
+            if self._pending is not None:
+                self.merged += 1
+                if priority < self._pending[0]:
+                    return
+            self._pending = (priority, freq, duration)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                wait = self._last + self.min_interval - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                _, freq, duration = self._pending
+                self._pending = None
+                self._last = time.monotonic()
+                self.played += 1
+            try:
+                self._beep(freq, duration)
+            except Exception:
+                pass
@@ -0,0 +1,330 @@
+"""
+CAPP Data Server - Upstream Governor
+Every ESPN request goes through one UpstreamGovernor, which combines:
+
+  - a process-wide token bucket, so no mix of poller threads, background
+    refreshes and cold client requests can exceed the configured rate;
+  - a circuit breaker per endpoint ("scoreboard", "summary"), which fails
+    fast while ESPN is erroring instead of piling on more requests;
+  - jittered exponential-backoff retries, paid for from a retry budget
+    that refills as a fraction of normal traffic, so retries cannot
+    multiply load during an outage;
+  - Retry-After on 429/503 pauses the whole bucket, not just one caller;
+  - per-call deadlines: every attempt's timeout, token wait and backoff is
+    clipped to the caller's remaining budget;
+  - optional hedging: when an attempt runs past the endpoint's observed p95
+    latency, a second identical request is fired and the first response
+    to arrive wins.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+
+class UpstreamError(Exception):
+    """Raised when the governor refuses or gives up on a request."""
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+class DeadlineExceeded(UpstreamError):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout):
+        """Take one token, waiting up to `timeout` s.  Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+                if now + wait > deadline:
+                    return False
+                self._cond.wait(wait)
+
+    def set_rate(self, rate, burst):
+        """Change the refill rate and capacity; tokens already banked are
+        kept, up to the new capacity."""
+        with self._cond:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+            self.capacity = float(burst)
+            self._tokens = min(self._tokens, self.capacity)
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Hold every caller back for `seconds` (upstream asked us to)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive failures; after
+    `reset_timeout` s one trial request is let through (half-open) and its
+    outcome closes or re-opens the circuit."""
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """True while requests should fail fast — open and not yet due for
+        a trial.  Unlike allow(), reserves nothing."""
+        with self._lock:
+            return (self.state == "open"
+                    and time.monotonic() - self.opened_at < self.reset_timeout)
+
+    def allow(self):
+        """May a request go out now?  In half-open state this reserves the
+        single trial: the caller must then record_success(),
+        record_failure() or release()."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                self._trial_in_flight = False
+            if self.state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """Give back a reserved trial without an outcome (the request never
+        reached upstream)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half-open" or self.failures >= self.threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """Each request deposits `ratio` of a retry token; each retry spends one.
+    Bounded by `max_tokens` so a quiet period can't bank a retry storm."""
+
+    def __init__(self, ratio=0.2, max_tokens=10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = float(max_tokens)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+class UpstreamGovernor:
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+    HEDGE_MIN_SAMPLES = 20      # latency samples needed before hedging
+    HEDGE_FLOOR = 0.05          # never hedge sooner than this (s)
+
+    def __init__(self, session, rate=8, burst=16, max_retries=2, backoff_base=0.5,
+                 breaker_threshold=5, breaker_reset=30, retry_ratio=0.2, acquire_timeout=15):
+        self.session = session
+        self.bucket = TokenBucket(rate, burst)
+        self.budget = RetryBudget(retry_ratio)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.acquire_timeout = acquire_timeout
+        self._breaker_args = (breaker_threshold, breaker_reset)
+        self._breakers = {}
+        self._metrics = {}
+        self._latency = {}      # endpoint -> deque of recent successful latencies (s)
+        self._lock = threading.Lock()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+    def _breaker(self, endpoint):
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(*self._breaker_args)
+                self._metrics[endpoint] = {"requests": 0, "ok": 0, "failures": 0,
+                                           "retries": 0, "short_circuited": 0,
+                                           "rate_limited": 0, "throttled_upstream": 0,
+                                           "deadline_exceeded": 0, "hedged": 0,
+                                           "hedge_wins": 0}
+                self._latency[endpoint] = deque(maxlen=200)
+            return self._breakers[endpoint]
+
+    def p95(self, endpoint):
+        """Observed p95 latency (s) for an endpoint, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._latency.get(endpoint, ()))
+        if len(samples) < self.HEDGE_MIN_SAMPLES:
+            return None
+        return samples[int(len(samples) * 0.95) - 1]
+
+    def _timed_get(self, endpoint, url, kwargs):
+        start = time.monotonic()
+        response = self.session.get(url, **kwargs)
+        if response.status_code not in self.RETRYABLE_STATUS:
+            with self._lock:
+                self._latency[endpoint].append(time.monotonic() - start)
+        return response
+
+    def _send(self, endpoint, url, kwargs, deadline, hedge):
+        """One attempt, optionally hedged.  Raises requests exceptions."""
+        if deadline is not None:
+            kwargs = dict(kwargs, timeout=min(kwargs.get("timeout") or float("inf"),
+                                              max(deadline - time.monotonic(), 0.001)))
+        delay = self.p95(endpoint) if hedge else None
+        if delay is None:
+            return self._timed_get(endpoint, url, kwargs)
+
+        first = self._hedge_pool.submit(self._timed_get, endpoint, url, kwargs)
+        done, _ = wait([first], timeout=max(delay, self.HEDGE_FLOOR))
+        if done or (deadline is not None and time.monotonic() >= deadline) \
+                or not self.bucket.acquire(0):
+            return first.result()
+        self._count(endpoint, "hedged")
+        self._count(endpoint, "requests")
+        second = self._hedge_pool.submit(self._timed_get, endpoint, url, kwargs)
+        done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        if winner is second:
+            self._count(endpoint, "hedge_wins")
+        try:
+            return winner.result()
+        except Exception:
+            # The winner failed fast — fall back to whatever the other one gets
+            return (second if winner is first else first).result()
+
+    def _count(self, endpoint, key):
+        with self._lock:
+            self._metrics[endpoint][key] += 1
+
+    def get(self, endpoint, url, deadline=None, hedge=False, **kwargs):
+        """
+        GET through the governor.  `deadline` is an absolute time.monotonic()
+        by which the caller needs an answer; `hedge` allows a second request
+        once the first outlives the endpoint's p95 latency.  Returns the
+        final Response (which may still be an HTTP error for the caller's
+        raise_for_status), or raises CircuitOpenError / DeadlineExceeded /
+        UpstreamError / the last requests exception.
+        """
+        breaker = self._breaker(endpoint)
+        if breaker.is_open():
+            self._count(endpoint, "short_circuited")
+            raise CircuitOpenError(f"{endpoint}: circuit open")
+        self.budget.deposit()
+
+        attempt = 0
+        error = response = None
+        while True:
+            wait_limit = self.acquire_timeout
+            if deadline is not None:
+                wait_limit = min(wait_limit, deadline - time.monotonic())
+                if wait_limit <= 0:
+                    self._count(endpoint, "deadline_exceeded")
+                    raise DeadlineExceeded(f"{endpoint}: deadline exceeded")
+            # Ask the breaker before taking a token, so a refused request
+            # doesn't drain the bucket.  A reserved half-open trial is from
+            # here always recorded or released.
+            if not breaker.allow():
+                if attempt == 0:
+                    self._count(endpoint, "short_circuited")
+                    raise CircuitOpenError(f"{endpoint}: circuit open")
+                if error is not None:
+                    raise error
+                return response
+            if not self.bucket.acquire(wait_limit):
+                breaker.release()
+                self._count(endpoint, "rate_limited")
+                raise UpstreamError(f"{endpoint}: local rate limit wait exceeded")
+            self._count(endpoint, "requests")
+            error = response = None
+            try:
+                response = self._send(endpoint, url, kwargs, deadline, hedge)
+            except requests.RequestException as e:
+                error = e
+            except BaseException:
+                breaker.release()
+                raise
+            if error is None and response.status_code not in self.RETRYABLE_STATUS:
+                breaker.record_success()
+                self._count(endpoint, "ok")
+                return response
+
+            breaker.record_failure()
+            self._count(endpoint, "failures")
+            delay = self.backoff_base * (2 ** attempt)
+            if response is not None and response.status_code in (429, 503):
+                self._count(endpoint, "throttled_upstream")
+                pause = _retry_after(response)
+                if pause is not None:
+                    self.bucket.pause(pause)
+                    delay = max(delay, pause)
+            out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+            if (attempt >= self.max_retries or out_of_time or breaker.is_open()
+                    or not self.budget.withdraw()):
+                if error is not None:
+                    raise error
+                return response
+            self._count(endpoint, "retries")
+            time.sleep(random.uniform(0, delay))   # full jitter
+            attempt += 1
+
+    def stats(self):
+        with self._lock:
+            endpoints = list(self._breakers)
+            stats = {endpoint: dict(self._metrics[endpoint],
+                                    circuit=self._breakers[endpoint].state)
+                     for endpoint in endpoints}
+        for endpoint in endpoints:
+            p95 = self.p95(endpoint)
+            stats[endpoint]["p95_ms"] = round(p95 * 1000, 1) if p95 is not None else None
+        return stats